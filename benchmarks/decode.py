@@ -0,0 +1,52 @@
+import argparse
+import json
+import timeit
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from src.models import Offer, decode_offers, decode_offers_trusted
+
+
+def make_body(size: int) -> bytes:
+    return json.dumps(
+        [
+            {"id": str(uuid4()), "price": index, "items_in_stock": index % 50}
+            for index in range(size)
+        ]
+    ).encode()
+
+
+def decode_dicts(content: bytes) -> List[Offer]:
+    # the previous path: response.json() followed by one Offer per dict
+    return [Offer(**offer_data) for offer_data in json.loads(content)]
+
+
+DECODERS: Dict[str, Callable[[bytes], List[Offer]]] = {
+    "json + Offer(**dict)": decode_dicts,
+    "validate_json": decode_offers,
+    "trusted": decode_offers_trusted,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark offer list decoding")
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    content = make_body(args.size)
+    baseline = None
+    print(f"{'decoder':<22} {'ms/body':>9} {'offers/s':>12} {'speedup':>8}")
+    for name, decoder in DECODERS.items():
+        seconds = min(
+            timeit.repeat(lambda: decoder(content), number=1, repeat=args.repeat)
+        )
+        baseline = baseline or seconds
+        print(
+            f"{name:<22} {seconds * 1000:>9.2f} {args.size / seconds:>12.0f} "
+            f"{baseline / seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
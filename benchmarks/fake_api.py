@@ -0,0 +1,165 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import random
+import re
+from dataclasses import dataclass
+from time import time
+from typing import Optional
+from uuid import uuid4
+
+import httpx
+import jwt
+
+OFFERS_PATH = re.compile(r"/products/(?P<product_id>[^/]+)/offers$")
+
+
+@dataclass
+class FakeApiConfig:
+    latency: float = 0.002
+    error_rate: float = 0.0
+    token_ttl: int = 300
+    offers_per_product: int = 10
+    seed: int = 0
+    # requests in flight the API serves before answering 429
+    capacity: Optional[int] = None
+    # gzip offer lists for clients that accept it
+    compress: bool = True
+    # send offer lists in chunks of about this many bytes, produced while the
+    # client reads them, instead of one buffered body
+    chunk_size: Optional[int] = None
+    # requests served at once, the rest wait in line (FIFO) for a worker
+    workers: Optional[int] = None
+
+
+class FakeOffersApi:
+    # in-process stand-in for the Offers API, served through httpx.MockTransport
+
+    def __init__(self, config: FakeApiConfig = FakeApiConfig()) -> None:
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.auth_calls = 0
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self._revoked_before = 0.0
+        self._offers_cache: dict = {}
+        self._workers = (
+            asyncio.Semaphore(config.workers) if config.workers is not None else None
+        )
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def revoke_tokens(self) -> None:
+        # every access token issued so far gets a 401 from now on
+        self._revoked_before = time()
+
+    def _issue_token(self) -> str:
+        issued_at = time()
+        return jwt.encode(
+            {"expires": int(issued_at) + self.config.token_ttl, "iat": issued_at},
+            "fake-offers-api-secret-key-32-bytes!",
+        )
+
+    def _token_valid(self, token: str) -> bool:
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            return False
+        return claims["expires"] >= time() and claims["iat"] > self._revoked_before
+
+    def _offers(self, product_id: str) -> list:
+        offers = self._offers_cache.get(product_id)
+        if offers is None:
+            offers = [
+                {
+                    "id": str(uuid4()),
+                    "price": self.random.randint(100, 10_000),
+                    "items_in_stock": self.random.randint(0, 500),
+                }
+                for _ in range(self.config.offers_per_product)
+            ]
+            self._offers_cache[product_id] = offers
+        return offers
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.config.capacity is not None and self.in_flight >= self.config.capacity:
+            self.rejected += 1
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        self.in_flight += 1
+        try:
+            if self._workers is None:
+                return await self._handle(request)
+            async with self._workers:
+                return await self._handle(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            self.errors += 1
+            return httpx.Response(503, headers={"Retry-After": "0"})
+
+        path = request.url.path
+        if path.endswith("/auth"):
+            self.auth_calls += 1
+            return httpx.Response(201, json={"access_token": self._issue_token()})
+
+        if not self._token_valid(request.headers.get("Bearer", "")):
+            return httpx.Response(401, json={"detail": "Access token invalid"})
+
+        if path.endswith("/products/register"):
+            product = json.loads(request.content)
+            return httpx.Response(201, json={"id": product["id"]})
+
+        match = OFFERS_PATH.search(path)
+        if match and request.method == "GET":
+            return self._offers_response(request, match["product_id"])
+        return httpx.Response(404, json={"detail": "Not found"})
+
+    def _offers_response(
+        self, request: httpx.Request, product_id: str
+    ) -> httpx.Response:
+        if self.config.chunk_size is not None:
+            return httpx.Response(
+                200,
+                content=self._offer_chunks(self._offers(product_id)),
+                headers={"content-type": "application/json"},
+            )
+        body = json.dumps(self._offers(product_id)).encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return httpx.Response(304, headers={"etag": etag})
+        headers = {"content-type": "application/json", "etag": etag}
+        if self.config.compress and "gzip" in request.headers.get(
+            "accept-encoding", ""
+        ):
+            body = gzip.compress(body, compresslevel=1)
+            headers["content-encoding"] = "gzip"
+        self.bytes_sent += len(body)
+        return httpx.Response(200, content=body, headers=headers)
+
+    async def _offer_chunks(self, offers: list):
+        chunk = bytearray(b"[")
+        for index, offer in enumerate(offers):
+            if index:
+                chunk += b","
+            chunk += json.dumps(offer).encode()
+            if len(chunk) >= self.config.chunk_size:
+                self.bytes_sent += len(chunk)
+                yield bytes(chunk)
+                chunk.clear()
+                # lets the client work on a chunk before the next one arrives
+                await asyncio.sleep(0)
+        chunk += b"]"
+        self.bytes_sent += len(chunk)
+        yield bytes(chunk)
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+from timeit import timeit
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from loguru import logger
+
+from src.log import configure_hot_path_logging, log_hot_path
+
+from .fake_api import FakeApiConfig, FakeOffersApi
+from .run import make_client
+
+# (already imported, timed statement). The package used to import client
+# and models, and jwt with them, eagerly. A real caller needs ProductClient;
+# what laziness saves it is jwt, imported later at the first token check
+IMPORTS: Dict[str, Tuple[str, str]] = {
+    "import src": ("", "import src"),
+    "import src (before)": ("", "import jwt, src.client, src.models"),
+    "from src import ProductClient": ("", "from src import ProductClient"),
+    "jwt after ProductClient": ("from src import ProductClient", "import jwt"),
+}
+
+# (hot-path level, sample rate), the sink always accepts INFO and above
+LOGGING_MODES: Dict[str, Tuple[Optional[str], float]] = {
+    "INFO, every call": ("INFO", 1.0),
+    "INFO, 1% sampled": ("INFO", 0.01),
+    "DEBUG, gated by sink": ("DEBUG", 1.0),
+    "off": (None, 1.0),
+}
+
+
+def measure_import(setup: str, statement: str, repeat: int) -> List[float]:
+    code = (
+        f"{setup}\n"
+        "from time import perf_counter\n"
+        "start = perf_counter()\n"
+        f"{statement}\n"
+        "print(perf_counter() - start)"
+    )
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    return [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                capture_output=True,
+                check=True,
+                text=True,
+                env=env,
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+
+
+async def measure_calls(calls: int) -> float:
+    api = FakeOffersApi(FakeApiConfig(latency=0.0, offers_per_product=1))
+    async with make_client(api) as client:
+        await client.get_product_offers(uuid4())
+        start = perf_counter()
+        for _ in range(calls):
+            await client.get_product_offers(uuid4())
+        return (perf_counter() - start) / calls
+
+
+def measure_message(number: int) -> Dict[str, float]:
+    # the logging call alone, the request path around it is much noisier
+    # than the difference between the modes
+    method, url, status_code = "GET", "http://offers.fake/api/v1/products", 200
+
+    def eager() -> None:
+        logger.info(f"{method} {url} -> {status_code}")
+
+    def hot_path() -> None:
+        log_hot_path("{} {} -> {}", method, url, status_code)
+
+    seconds = {"eager f-string at INFO (before)": timeit(eager, number=number)}
+    for name, (level, sample_rate) in LOGGING_MODES.items():
+        configure_hot_path_logging(level, sample_rate)
+        seconds[name] = timeit(hot_path, number=number)
+    return {name: total / number for name, total in seconds.items()}
+
+
+def spread(values: List[float], scale: float) -> str:
+    return (
+        f"{statistics.median(values) * scale:>8.1f} "
+        f"{min(values) * scale:>8.1f} {max(values) * scale:>8.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="benchmark import time and per-call logging overhead"
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'import':<34} {'median':>8} {'min':>8} {'max':>8}  (ms)")
+    for name, (setup, statement) in IMPORTS.items():
+        timings = measure_import(setup, statement, args.repeat)
+        print(f"{name:<34} {spread(timings, 1000)}")
+
+    logger.remove()
+    logger.add(lambda message: None, level="INFO")
+    print(f"\n{'one log message':<34} {'us':>8}")
+    for name, seconds in measure_message(args.messages).items():
+        print(f"{name:<34} {seconds * 1e6:>8.2f}")
+
+    # modes interleaved per round, so drift hits every mode alike
+    per_call: Dict[str, List[float]] = {name: [] for name in LOGGING_MODES}
+    for _ in range(args.rounds):
+        for name, (level, sample_rate) in LOGGING_MODES.items():
+            configure_hot_path_logging(level, sample_rate)
+            per_call[name].append(asyncio.run(measure_calls(args.calls)))
+    print(f"\n{'get_product_offers':<34} {'median':>8} {'min':>8} {'max':>8}  (us)")
+    for name, seconds in per_call.items():
+        print(f"{name:<34} {spread(seconds, 1e6)}")
+
+
+if __name__ == "__main__":
+    main()
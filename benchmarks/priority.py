@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+from typing import List, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+from loguru import logger
+
+from src.client import ProductClient
+from src.scheduler import BULK, INTERACTIVE, Lane, PriorityScheduler
+
+from .fake_api import FakeApiConfig, FakeOffersApi
+from .run import BASE_URL, make_products
+
+MODES = ("idle", "background", "background + lanes")
+
+
+def make_scheduler(workers: int, reserved: int) -> PriorityScheduler:
+    # bulk never takes the last `reserved` slots, interactive calls find a
+    # free worker without queueing behind the backfill
+    return PriorityScheduler(
+        concurrency=workers,
+        lanes={
+            INTERACTIVE: Lane(weight=4.0),
+            BULK: Lane(weight=1.0, max_concurrency=workers - reserved),
+        },
+    )
+
+
+async def interactive_calls(
+    client: ProductClient,
+    interval: float,
+    calls: Optional[int] = None,
+    until: Optional[asyncio.Task] = None,
+) -> List[float]:
+    # a fixed number of calls, or as many as fit while `until` runs
+    latencies: List[float] = []
+    while len(latencies) != calls and not (until is not None and until.done()):
+        start = perf_counter()
+        await client.get_product_offers(uuid4())
+        latencies.append(perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def backfill(client: ProductClient, size: int, concurrency: int) -> float:
+    # registrations per second
+    start = perf_counter()
+    registered = 0
+    async for _, result in client.register_products(
+        make_products(size), concurrency=concurrency
+    ):
+        registered += not isinstance(result, Exception)
+    return registered / (perf_counter() - start)
+
+
+async def run_mode(
+    mode: str, config: FakeApiConfig, args: argparse.Namespace
+) -> Tuple[List[float], Optional[float]]:
+    api = FakeOffersApi(config)
+    scheduler = (
+        make_scheduler(config.workers, args.reserved)
+        if mode == "background + lanes"
+        else None
+    )
+    async with ProductClient(
+        "benchmark-refresh-token",
+        BASE_URL,
+        client=httpx.AsyncClient(transport=api.transport()),
+        token_file=None,
+        scheduler=scheduler,
+    ) as client:
+        await client.token_manager.get_access_token()
+        if mode == "idle":
+            return await interactive_calls(
+                client, args.interval, calls=args.calls
+            ), None
+        background = asyncio.create_task(
+            backfill(client, args.size, args.bulk_concurrency)
+        )
+        # let the backfill fill the server's queue first
+        await asyncio.sleep(0.05)
+        latencies = await interactive_calls(client, args.interval, until=background)
+        return latencies, await background
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="interactive latency while a bulk backfill runs"
+    )
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--reserved", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--bulk-concurrency", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005)
+    args = parser.parse_args()
+
+    logger.remove()
+    config = FakeApiConfig(latency=args.latency, workers=args.workers)
+    print(
+        f"{'mode':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'bulk/s':>8}"
+    )
+    for mode in MODES:
+        latencies, bulk_rate = asyncio.run(run_mode(mode, config, args))
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(
+            f"{mode:<20} {quantiles[49] * 1000:>8.2f} {quantiles[94] * 1000:>8.2f} "
+            f"{quantiles[98] * 1000:>8.2f} {max(latencies) * 1000:>8.2f} "
+            f"{f'{bulk_rate:.0f}' if bulk_rate is not None else '-':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
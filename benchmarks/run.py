@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import statistics
+import tracemalloc
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+from loguru import logger
+
+from src.client import ProductClient
+from src.concurrency import AdaptiveLimiter
+from src.conditional import ConditionalCache
+from src.models import Product
+
+from .fake_api import FakeApiConfig, FakeOffersApi
+
+BASE_URL = "http://offers.fake/api/v1"
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    calls: int
+    elapsed: float
+    latencies: List[float] = field(default_factory=list)
+    peak_memory: int = 0
+    auth_calls: int = 0
+    http_requests: int = 0
+    rejected: int = 0
+    failed: int = 0
+    not_modified: int = 0
+    bytes_received: int = 0
+    concurrency_limit: Optional[int] = None
+
+    def percentile(self, percent: float) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[int(percent) - 1]
+
+    def row(self) -> str:
+        return (
+            f"{self.name:<20} {self.calls:>7} {self.calls / self.elapsed:>10.0f} "
+            f"{self.percentile(50) * 1000:>8.2f} {self.percentile(95) * 1000:>8.2f} "
+            f"{self.percentile(99) * 1000:>8.2f} {self.peak_memory / 1024:>10.0f} "
+            f"{self.auth_calls:>6} {self.http_requests:>8} {self.rejected:>6} "
+            f"{self.failed:>6} {self.not_modified:>6} "
+            f"{self.bytes_received / 1024:>8.0f} "
+            f"{self.concurrency_limit if self.concurrency_limit else '-':>6}"
+        )
+
+
+HEADER = (
+    f"{'scenario':<20} {'calls':>7} {'calls/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+    f"{'p99 ms':>8} {'peak KiB':>10} {'auth':>6} {'http':>8} {'429s':>6} "
+    f"{'failed':>6} {'304s':>6} {'rx KiB':>8} {'limit':>6}"
+)
+
+
+def timed(func: Callable[..., Awaitable], latencies: List[float]):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            latencies.append(perf_counter() - start)
+
+    return wrapper
+
+
+def make_client(
+    api: FakeOffersApi, adaptive: bool = False, conditional: bool = False
+) -> ProductClient:
+    http_client = httpx.AsyncClient(transport=api.transport())
+    return ProductClient(
+        "benchmark-refresh-token",
+        BASE_URL,
+        client=http_client,
+        token_file=None,
+        concurrency_limiter=AdaptiveLimiter() if adaptive else None,
+        conditional_cache=ConditionalCache() if conditional else None,
+    )
+
+
+def bulk_concurrency(client: ProductClient) -> Optional[int]:
+    # with an adaptive limiter the client picks the task window itself
+    return None if client.concurrency_limiter is not None else 50
+
+
+def make_products(count: int) -> List[Product]:
+    return [
+        Product(id=uuid4(), name=f"Product {index}", description="benchmark")
+        for index in range(count)
+    ]
+
+
+async def single_call(client: ProductClient, api: FakeOffersApi, size: int) -> None:
+    for product_id in [uuid4() for _ in range(size)]:
+        await client.get_product_offers(product_id)
+
+
+async def bulk_register(client: ProductClient, api: FakeOffersApi, size: int) -> int:
+    failed = 0
+    async for _, result in client.register_products(
+        make_products(size), concurrency=bulk_concurrency(client)
+    ):
+        failed += isinstance(result, Exception)
+    return failed
+
+
+async def multi_product_offers(
+    client: ProductClient, api: FakeOffersApi, size: int
+) -> int:
+    failed = 0
+    async for _, result in client.get_offers_for_many(
+        (uuid4() for _ in range(size)), concurrency=bulk_concurrency(client)
+    ):
+        failed += isinstance(result, Exception)
+    return failed
+
+
+async def token_expiry_storm(
+    client: ProductClient, api: FakeOffersApi, size: int
+) -> None:
+    await client.get_product_offers(uuid4())
+    api.revoke_tokens()
+    await asyncio.gather(*(client.get_product_offers(uuid4()) for _ in range(size)))
+
+
+async def poll_offers(client: ProductClient, api: FakeOffersApi, size: int) -> int:
+    # the same few products polled over and over, offers never change
+    product_ids = [uuid4() for _ in range(20)]
+    failed = 0
+    async for _, result in client.get_offers_for_many(
+        (product_ids[index % len(product_ids)] for index in range(size)),
+        concurrency=len(product_ids),
+    ):
+        failed += isinstance(result, Exception)
+    return failed
+
+
+# scenarios may return how many calls failed, bulk ones keep going on errors
+SCENARIOS: Dict[str, Callable[[ProductClient, FakeOffersApi, int], Awaitable]] = {
+    "single_call": single_call,
+    "bulk_register": bulk_register,
+    "multi_product_offers": multi_product_offers,
+    "token_expiry_storm": token_expiry_storm,
+    "poll_offers": poll_offers,
+}
+
+
+async def run_scenario(
+    name: str,
+    config: FakeApiConfig,
+    size: int,
+    adaptive: bool = False,
+    conditional: bool = False,
+) -> ScenarioResult:
+    api = FakeOffersApi(config)
+    latencies: List[float] = []
+    async with make_client(api, adaptive, conditional) as client:
+        client.register_product = timed(client.register_product, latencies)
+        client.get_product_offers = timed(client.get_product_offers, latencies)
+        start = perf_counter()
+        failed = await SCENARIOS[name](client, api, size)
+        elapsed = perf_counter() - start
+        concurrency_limit = client.concurrency_limit
+    return ScenarioResult(
+        name=name,
+        calls=len(latencies),
+        elapsed=elapsed,
+        latencies=latencies,
+        auth_calls=api.auth_calls,
+        http_requests=api.requests,
+        rejected=api.rejected,
+        failed=failed or 0,
+        concurrency_limit=concurrency_limit,
+        not_modified=api.not_modified,
+        bytes_received=api.bytes_sent,
+    )
+
+
+async def measure_peak_memory(
+    name: str,
+    config: FakeApiConfig,
+    size: int,
+    adaptive: bool = False,
+    conditional: bool = False,
+) -> int:
+    # separate pass, tracemalloc slows everything down and would skew timings
+    api = FakeOffersApi(config)
+    async with make_client(api, adaptive, conditional) as client:
+        tracemalloc.start()
+        try:
+            await SCENARIOS[name](client, api, size)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark ProductClient")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS))
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=int, default=300)
+    parser.add_argument("--offers", type=int, default=10)
+    parser.add_argument(
+        "--capacity", type=int, help="requests in flight before the API sends 429"
+    )
+    parser.add_argument(
+        "--adaptive", action="store_true", help="use an AdaptiveLimiter"
+    )
+    parser.add_argument(
+        "--conditional",
+        action="store_true",
+        help="revalidate offers with ETags through a ConditionalCache",
+    )
+    parser.add_argument(
+        "--no-compression", action="store_true", help="fake API never gzips"
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    config = FakeApiConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+        offers_per_product=args.offers,
+        capacity=args.capacity,
+        compress=not args.no_compression,
+    )
+    print(HEADER)
+    for name in args.scenario or SCENARIOS:
+        result = asyncio.run(
+            run_scenario(name, config, args.size, args.adaptive, args.conditional)
+        )
+        result.peak_memory = asyncio.run(
+            measure_peak_memory(
+                name, config, args.size, args.adaptive, args.conditional
+            )
+        )
+        print(result.row())
+
+
+if __name__ == "__main__":
+    main()
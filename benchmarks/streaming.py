@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import statistics
+import tracemalloc
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, List, Tuple
+from uuid import UUID, uuid4
+
+from loguru import logger
+
+from src.client import ProductClient
+
+from .fake_api import FakeApiConfig, FakeOffersApi
+from .run import make_client
+
+
+async def buffered(client: ProductClient, product_id: UUID) -> Tuple[float, int]:
+    start = perf_counter()
+    offers = await client.get_product_offers(product_id)
+    return perf_counter() - start, len(offers)
+
+
+async def streamed(client: ProductClient, product_id: UUID) -> Tuple[float, int]:
+    start = perf_counter()
+    first_offer = None
+    count = 0
+    async for _ in client.iter_product_offers(product_id):
+        if first_offer is None:
+            first_offer = perf_counter() - start
+        count += 1
+    return first_offer or 0.0, count
+
+
+MODES: Dict[str, Callable[[ProductClient, UUID], Awaitable[Tuple[float, int]]]] = {
+    "get_product_offers": buffered,
+    "iter_product_offers": streamed,
+}
+
+
+async def measure(
+    mode: str, config: FakeApiConfig, repeat: int, trace: bool
+) -> Tuple[List[float], float, int]:
+    api = FakeOffersApi(config)
+    product_id = uuid4()
+    # generated up front so the fake API's own list is not traced
+    api._offers(str(product_id))
+    first_offer: List[float] = []
+    async with make_client(api) as client:
+        await client.token_manager.get_access_token()
+        if trace:
+            tracemalloc.start()
+        try:
+            start = perf_counter()
+            for _ in range(repeat):
+                elapsed, count = await MODES[mode](client, product_id)
+                first_offer.append(elapsed)
+            total = perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        finally:
+            if trace:
+                tracemalloc.stop()
+    return first_offer, total / repeat, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="time to first offer and peak memory of buffered vs streamed offers"
+    )
+    parser.add_argument("--offers", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    config = FakeApiConfig(
+        latency=0.0, offers_per_product=args.offers, chunk_size=args.chunk_size
+    )
+    print(
+        f"{'mode':<22} {'offers':>8} {'first offer ms':>15} {'total ms':>10} "
+        f"{'peak KiB':>10}"
+    )
+    for mode in MODES:
+        first_offer, total, _ = asyncio.run(measure(mode, config, args.repeat, False))
+        # separate pass, tracemalloc slows everything down and would skew timings
+        _, _, peak = asyncio.run(measure(mode, config, 1, True))
+        print(
+            f"{mode:<22} {args.offers:>8} "
+            f"{statistics.median(first_offer) * 1000:>15.2f} "
+            f"{total * 1000:>10.2f} {peak / 1024:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
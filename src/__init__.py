@@ -1,4 +1,66 @@
-from .client import ProductClient
-from .models import Offer, Product
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["ProductClient", "Product", "Offer"]
+if TYPE_CHECKING:
+    from .breaker import CircuitBreaker, CircuitOpenError
+    from .cache import TTLCache
+    from .client import ProductClient
+    from .concurrency import AdaptiveLimiter
+    from .conditional import ConditionalCache
+    from .frame import OffersFrame
+    from .hedge import HedgePolicy
+    from .instrumentation import Instrumentation
+    from .models import Offer, Product
+    from .pool import ProductClientPool
+    from .ratelimit import RateLimiter
+    from .registration_queue import RegistrationQueue
+    from .registry import RegisteredIdCache
+    from .scheduler import Lane, PriorityScheduler, request_priority
+    from .snapshots import OfferSnapshotStore
+    from .sync_client import SyncProductClient
+    from .token_store import FileTokenStore, SQLiteTokenStore, TokenStore
+    from .watch import OfferChange
+
+# submodules (and httpx, pydantic, tenacity behind them) are imported on
+# first attribute access, so `import src` stays cheap for short-lived jobs
+_EXPORTS = {
+    "ProductClient": ".client",
+    "SyncProductClient": ".sync_client",
+    "Product": ".models",
+    "Offer": ".models",
+    "TTLCache": ".cache",
+    "RateLimiter": ".ratelimit",
+    "TokenStore": ".token_store",
+    "FileTokenStore": ".token_store",
+    "SQLiteTokenStore": ".token_store",
+    "Instrumentation": ".instrumentation",
+    "OffersFrame": ".frame",
+    "OfferChange": ".watch",
+    "OfferSnapshotStore": ".snapshots",
+    "HedgePolicy": ".hedge",
+    "CircuitBreaker": ".breaker",
+    "CircuitOpenError": ".breaker",
+    "RegisteredIdCache": ".registry",
+    "RegistrationQueue": ".registration_queue",
+    "AdaptiveLimiter": ".concurrency",
+    "ConditionalCache": ".conditional",
+    "ProductClientPool": ".pool",
+    "PriorityScheduler": ".scheduler",
+    "Lane": ".scheduler",
+    "request_priority": ".scheduler",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,75 +1,291 @@
-import json
+import asyncio
 import os
 from pathlib import Path
-from time import time
-from typing import Any, Dict, Optional
+from time import monotonic, time
+from typing import Any, Callable, Dict, Optional, Union
 
 import httpx
-import jwt
 from loguru import logger
 
-from .request import perform_request
+from .breaker import CircuitBreaker
+from .concurrency import AdaptiveLimiter
+from .instrumentation import current_call, detached, phase
+from .log import log_hot_path
+from .ratelimit import RateLimiter
+from .request import create_http_client, endpoint_key, perform_request
+from .scheduler import PriorityScheduler, request_priority
+from .token_store import FileTokenStore, TokenStore
+
+# lower bound between two background refreshes, protects /auth from a tight
+# loop when the server hands out tokens without a usable `expires` claim
+MIN_REFRESH_INTERVAL = 5.0
+DEFAULT_TOKEN_FILE = "./.dx_heroes_token.json"
+STORE_LOCK_POLL_INTERVAL = 0.05
 
 
 class TokenManager:
-    def __init__(self, refresh_token: str, base_url: str) -> None:
+    def __init__(
+        self,
+        refresh_token: str,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        refresh_margin: Optional[float] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        token_file: Optional[Union[str, os.PathLike]] = DEFAULT_TOKEN_FILE,
+        token_store: Optional[TokenStore] = None,
+        store_lock_timeout: float = 30.0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+        scheduler: Optional[PriorityScheduler] = None,
+    ) -> None:
         self.refresh_token = refresh_token
         self.base_url = base_url
-        self.token_file = Path(os.path.expanduser("./.dx_heroes_token.json"))
-        self.access_token: Optional[str] = self.load_access_token_from_file()
+        self.refresh_margin = refresh_margin
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.concurrency_limiter = concurrency_limiter
+        self.scheduler = scheduler
+        self._owns_client = client is None
+        self.client = client if client is not None else create_http_client()
+        # token_file=None without a token_store keeps the token in memory only
+        if token_store is None and token_file is not None:
+            token_store = FileTokenStore(token_file)
+        self.token_store = token_store
+        self.token_file: Optional[Path] = (
+            token_store.path if isinstance(token_store, FileTokenStore) else None
+        )
+        self.store_lock_timeout = store_lock_timeout
+        self._access_token: Optional[str] = None
+        self._access_token_expiry = 0
+        self._token_loaded = self.token_store is None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, token: Optional[str]) -> None:
+        # expiry is decoded once per token so the hot path is an int compare
+        self._access_token = token
+        self._access_token_expiry = self.get_token_expiry(token) if token else 0
+        self._token_loaded = True
 
     def save_access_token_to_file(self, token: str) -> None:
-        try:
-            self.token_file.write_text(json.dumps({"access_token": token}))
-        except OSError as e:
-            logger.error(f"error saving token to file: {e}")
-            raise
+        if self.token_store is not None:
+            self.token_store.save(token)
 
     def load_access_token_from_file(self) -> Optional[str]:
-        if not self.token_file.exists():
-            return None
-        try:
-            data = json.loads(self.token_file.read_text())
-            return data.get("access_token")
-        except (json.JSONDecodeError, OSError) as e:
-            logger.error(f"error loading token from file: {e}")
+        if self.token_store is None:
             return None
+        return self.token_store.load()
+
+    async def save_access_token(self, token: str) -> None:
+        if self.token_store is not None:
+            await asyncio.to_thread(self.save_access_token_to_file, token)
+
+    async def load_access_token(self) -> Optional[str]:
+        token = await asyncio.to_thread(self.load_access_token_from_file)
+        if not self._token_loaded:
+            self.access_token = token
+        return self.access_token
 
     async def authenticate(self) -> str:
-        token_data = await perform_request(
-            f"{self.base_url}/auth", "POST", self.refresh_token
-        )
+        # single-flight: concurrent callers share the refresh already in flight,
+        # shield keeps a cancelled waiter from cancelling it for everyone else
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._request_access_token())
+        return await asyncio.shield(self._refresh_task)
+
+    async def _request_access_token(self) -> str:
+        if self.token_store is None:
+            return await self._fetch_access_token()
+        rejected_token = self._access_token
+        locked = await self._lock_token_store()
+        try:
+            # another process may have refreshed while we waited for the lock
+            stored_token = await asyncio.to_thread(self.load_access_token_from_file)
+            if (
+                stored_token
+                and stored_token != rejected_token
+                and self.get_token_expiry(stored_token) >= int(time())
+            ):
+                logger.info("using token refreshed by another process")
+                self.access_token = stored_token
+                return stored_token
+            return await self._fetch_access_token()
+        finally:
+            if locked:
+                await asyncio.to_thread(self.token_store.unlock)
+
+    async def _lock_token_store(self) -> bool:
+        deadline = monotonic() + self.store_lock_timeout
+        while not await asyncio.to_thread(self.token_store.try_lock):
+            if monotonic() >= deadline:
+                logger.warning("timed out waiting for token store lock")
+                return False
+            await asyncio.sleep(STORE_LOCK_POLL_INTERVAL)
+        return True
+
+    async def _fetch_access_token(self) -> str:
+        record = current_call()
+        start = monotonic()
+        # shared by every waiting caller, so it runs in the default lane
+        with detached(), request_priority(None):
+            token_data = await self._perform_request(
+                f"{self.base_url}/auth", "POST", self.refresh_token
+            )
+        if record is not None:
+            record.instrumentation.emit(
+                "token_refresh", name=record.name, duration=monotonic() - start
+            )
         access_token = token_data.get("access_token")
         self.access_token = access_token
-        self.save_access_token_to_file(access_token)
+        await self.save_access_token(access_token)
         return access_token
 
-    def is_token_expired(self, token: str) -> bool:
+    def get_token_expiry(self, token: str) -> int:
+        # jwt is only needed once per token, not for importing the SDK
+        import jwt
+
         try:
             token_data = jwt.decode(token, options={"verify_signature": False})
-            token_exp_timestamp = token_data.get("expires", 0)
-            current_timestamp = int(time())
-            return token_exp_timestamp < current_timestamp
+            return token_data.get("expires", 0)
         except Exception as e:
             logger.error(f"error decoding JWT: {e}")
-            return True
+            return 0
+
+    def is_token_expired(self, token: str) -> bool:
+        if token == self._access_token:
+            return self._access_token_expiry < int(time())
+        return self.get_token_expiry(token) < int(time())
 
     async def get_access_token(self) -> str:
-        if not self.access_token or self.is_token_expired(self.access_token):
+        if not self._token_loaded:
+            await self.load_access_token()
+        if not self._access_token or self._access_token_expiry < int(time()):
             logger.info("token not saved in file or expired, getting new token")
             return await self.authenticate()
-        logger.info("using saved token")
+        log_hot_path("using saved token")
         return self.access_token
 
     async def execute_authenticated_request(
-        self, url: str, method: str, data: Optional[Dict[str, Any]] = None
+        self,
+        url: str,
+        method: str,
+        data: Optional[Dict[str, Any]] = None,
+        decoder: Optional[Callable[[bytes], Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_handler: Optional[Callable[[httpx.Response], Any]] = None,
+        stream: bool = False,
     ) -> Any:
+        access_token = None
         try:
-            access_token = await self.get_access_token()
-            return await perform_request(url, method, access_token, data)
+            with phase("token"):
+                access_token = await self.get_access_token()
+            return await self._perform_request(
+                url,
+                method,
+                access_token,
+                data,
+                decoder,
+                headers,
+                response_handler,
+                stream,
+            )
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 401:
-                logger.info("trying auth once again")
-                access_token = await self.authenticate()
-                return await perform_request(url, method, access_token, data)
+                record = current_call()
+                if record is not None:
+                    record.instrumentation.emit("reauth", name=record.name)
+                if self.access_token and self.access_token != access_token:
+                    # another coroutine already replaced the rejected token
+                    logger.info("token refreshed meanwhile, retrying")
+                    access_token = self.access_token
+                else:
+                    logger.info("trying auth once again")
+                    access_token = await self.authenticate()
+                return await self._perform_request(
+                    url,
+                    method,
+                    access_token,
+                    data,
+                    decoder,
+                    headers,
+                    response_handler,
+                    stream,
+                )
             raise
+
+    async def _perform_request(
+        self,
+        url: str,
+        method: str,
+        token: str,
+        data: Optional[Dict[str, Any]] = None,
+        decoder: Optional[Callable[[bytes], Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_handler: Optional[Callable[[httpx.Response], Any]] = None,
+        stream: bool = False,
+    ) -> Any:
+        return await perform_request(
+            url,
+            method,
+            token,
+            data,
+            client=self.client,
+            rate_limiter=self.rate_limiter,
+            endpoint=endpoint_key(url, self.base_url),
+            decoder=decoder,
+            circuit_breaker=self.circuit_breaker,
+            concurrency_limiter=self.concurrency_limiter,
+            headers=headers,
+            response_handler=response_handler,
+            stream=stream,
+            scheduler=self.scheduler,
+        )
+
+    def start_background_refresh(self) -> None:
+        if self.refresh_margin is None:
+            raise ValueError("refresh_margin must be set to refresh in background")
+        if (
+            self._background_refresh_task is None
+            or self._background_refresh_task.done()
+        ):
+            self._background_refresh_task = asyncio.create_task(
+                self._background_refresh()
+            )
+
+    async def stop_background_refresh(self) -> None:
+        task, self._background_refresh_task = self._background_refresh_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def seconds_until_refresh(self) -> float:
+        if not self.access_token:
+            return 0.0
+        refresh_at = self._access_token_expiry - self.refresh_margin
+        return max(refresh_at - time(), 0.0)
+
+    async def _background_refresh(self) -> None:
+        if not self._token_loaded:
+            await self.load_access_token()
+        min_delay = 0.0
+        while True:
+            await asyncio.sleep(max(self.seconds_until_refresh(), min_delay))
+            try:
+                await self.authenticate()
+            except Exception as e:
+                logger.error(f"background token refresh failed: {e}")
+            min_delay = MIN_REFRESH_INTERVAL
+
+    async def aclose(self) -> None:
+        await self.stop_background_refresh()
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,153 @@
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+import httpx
+from loguru import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+StateListener = Callable[[str, str, str], None]
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"circuit for {endpoint} is open, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def is_failure(exception: BaseException) -> bool:
+    # only outages count, client errors like 401 or 422 mean upstream is up
+    if isinstance(exception, httpx.RequestError):
+        return True
+    return (
+        isinstance(exception, httpx.HTTPStatusError)
+        and exception.response.status_code >= 500
+    )
+
+
+class _Circuit:
+    def __init__(self, window: int) -> None:
+        self.state = CLOSED
+        self.outcomes: deque = deque(maxlen=window)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        listeners: Iterable[StateListener] = (),
+    ) -> None:
+        if not 0 < failure_threshold <= 1:
+            raise ValueError("failure_threshold must be in (0, 1]")
+        if min_calls > window:
+            raise ValueError("min_calls cannot exceed window")
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.listeners = list(listeners)
+        self._circuits: Dict[str, _Circuit] = {}
+
+    def add_listener(self, listener: StateListener) -> None:
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def state(self, endpoint: str) -> str:
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            return CLOSED
+        if circuit.state == OPEN and self._retry_in(circuit) <= 0:
+            return HALF_OPEN
+        return circuit.state
+
+    def states(self) -> Dict[str, str]:
+        return {endpoint: self.state(endpoint) for endpoint in self._circuits}
+
+    def _circuit(self, endpoint: str) -> _Circuit:
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            circuit = self._circuits[endpoint] = _Circuit(self.window)
+        return circuit
+
+    def _retry_in(self, circuit: _Circuit) -> float:
+        return circuit.opened_at + self.reset_timeout - monotonic()
+
+    def _transition(self, endpoint: str, circuit: _Circuit, state: str) -> None:
+        previous, circuit.state = circuit.state, state
+        if state == OPEN:
+            circuit.opened_at = monotonic()
+            logger.warning(f"circuit for {endpoint} opened")
+        else:
+            logger.info(f"circuit for {endpoint} {previous} -> {state}")
+        if state == CLOSED:
+            circuit.outcomes.clear()
+            circuit.failures = 0
+        for listener in self.listeners:
+            try:
+                listener(endpoint, previous, state)
+            except Exception as e:
+                logger.error(f"circuit listener failed on {endpoint}: {e}")
+
+    def _before_call(self, endpoint: str) -> bool:
+        # returns whether the call is a half-open probe
+        circuit = self._circuit(endpoint)
+        if circuit.state == OPEN:
+            retry_in = self._retry_in(circuit)
+            if retry_in > 0:
+                raise CircuitOpenError(endpoint, retry_in)
+            self._transition(endpoint, circuit, HALF_OPEN)
+        if circuit.state == HALF_OPEN:
+            if circuit.probes >= self.half_open_probes:
+                raise CircuitOpenError(endpoint, 0.0)
+            circuit.probes += 1
+            return True
+        return False
+
+    def _record(self, endpoint: str, failed: bool, probe: bool) -> None:
+        circuit = self._circuit(endpoint)
+        if probe:
+            circuit.probes -= 1
+            if circuit.state == HALF_OPEN:
+                self._transition(endpoint, circuit, OPEN if failed else CLOSED)
+            return
+        if circuit.state != CLOSED:
+            return
+        if len(circuit.outcomes) == circuit.outcomes.maxlen:
+            circuit.failures -= circuit.outcomes[0]
+        circuit.outcomes.append(failed)
+        circuit.failures += failed
+        if (
+            len(circuit.outcomes) >= self.min_calls
+            and circuit.failures / len(circuit.outcomes) >= self.failure_threshold
+        ):
+            self._transition(endpoint, circuit, OPEN)
+
+    @contextmanager
+    def guard(self, endpoint: str) -> Iterator[None]:
+        # fails fast with CircuitOpenError while the endpoint's circuit is open
+        probe = self._before_call(endpoint)
+        try:
+            yield
+        except Exception as e:
+            self._record(endpoint, is_failure(e), probe)
+            raise
+        except BaseException:
+            # a cancelled probe frees its slot without deciding anything
+            if probe:
+                self._circuit(endpoint).probes -= 1
+            raise
+        else:
+            self._record(endpoint, False, probe)
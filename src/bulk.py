@@ -0,0 +1,82 @@
+import asyncio
+from collections import deque
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ItemSource = Union[Iterable[T], AsyncIterable[T]]
+ItemResult = Tuple[T, Union[R, Exception]]
+
+
+async def iterate(items: ItemSource[T]) -> AsyncIterator[T]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def _capture(func: Callable[[T], Awaitable[R]], item: T) -> ItemResult:
+    try:
+        return item, await func(item)
+    except Exception as e:
+        return item, e
+
+
+async def bounded_gather(
+    func: Callable[[T], Awaitable[R]],
+    items: ItemSource[T],
+    concurrency: int,
+    ordered: bool = False,
+) -> AsyncIterator[ItemResult]:
+    # input is pulled lazily and at most `concurrency` calls are in flight, so
+    # memory stays flat no matter how many items the source yields; errors are
+    # yielded in place of results instead of cancelling the rest of the batch
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    if ordered:
+        in_flight: deque = deque()
+        try:
+            async for item in iterate(items):
+                if len(in_flight) >= concurrency:
+                    yield await in_flight.popleft()
+                in_flight.append(asyncio.create_task(_capture(func, item)))
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            for task in in_flight:
+                task.cancel()
+        return
+
+    pending: Set[asyncio.Task] = set()
+    try:
+        async for item in iterate(items):
+            while len(pending) >= concurrency:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+            pending.add(asyncio.create_task(_capture(func, item)))
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
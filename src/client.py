@@ -1,27 +1,439 @@
-from typing import List
+import asyncio
+import os
+from contextlib import nullcontext
+from functools import partial
+from time import time
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from uuid import UUID
 
-from .auth import TokenManager
-from .models import Offer, Product, ProductRegistered
+import httpx
+from loguru import logger
+
+from .auth import DEFAULT_TOKEN_FILE, TokenManager
+from .breaker import CircuitBreaker
+from .bulk import ItemSource, bounded_gather
+from .cache import TTLCache
+from .concurrency import AdaptiveLimiter
+from .conditional import ConditionalCache
+from .deadline import call_deadline
+from .hedge import HedgePolicy
+from .instrumentation import Instrumentation, pool_stats
+from .models import (
+    Offer,
+    Product,
+    ProductRegistered,
+    TrustedOffer,
+    decode_offers,
+    decode_offers_trusted,
+    decode_product_registered,
+    decode_product_registered_trusted,
+)
+from .ratelimit import RateLimiter
+from .registration_queue import Callback, RegistrationQueue
+from .registry import RegisteredIdCache
+from .request import create_http_client
+from .scheduler import PriorityScheduler, in_lane, request_priority
+from .snapshots import OfferSnapshotStore
+from .streaming import iter_json_array
+from .token_store import TokenStore
+from .watch import OfferChange, watch_offers
+
+DEFAULT_BASE_URL = "https://python.exercise.applifting.cz/api/v1"
 
 
 class ProductClient:
     def __init__(
-        self, refresh_token, base_url="https://python.exercise.applifting.cz/api/v1"
+        self,
+        refresh_token,
+        base_url=DEFAULT_BASE_URL,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        client: Optional[httpx.AsyncClient] = None,
+        refresh_margin: Optional[float] = None,
+        offers_cache: Optional[TTLCache[UUID, List[Offer]]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        token_file: Optional[Union[str, os.PathLike]] = DEFAULT_TOKEN_FILE,
+        token_store: Optional[TokenStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        trusted_responses: bool = False,
+        snapshot_store: Optional[OfferSnapshotStore] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        deadline: Optional[float] = None,
+        hedge: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        registered_ids: Optional[RegisteredIdCache] = None,
+        registration_queue: Optional[RegistrationQueue] = None,
+        concurrency_limiter: Optional[AdaptiveLimiter] = None,
+        conditional_cache: Optional[ConditionalCache[UUID, List[Offer]]] = None,
+        scheduler: Optional[PriorityScheduler] = None,
     ):
-        self.token_manager = TokenManager(refresh_token, base_url)
+        self._owns_client = client is None
+        self.http_client = (
+            client if client is not None else create_http_client(limits, http2, timeout)
+        )
+        self.token_manager = TokenManager(
+            refresh_token,
+            base_url,
+            self.http_client,
+            refresh_margin=refresh_margin,
+            rate_limiter=rate_limiter,
+            token_file=token_file,
+            token_store=token_store,
+            circuit_breaker=circuit_breaker,
+            concurrency_limiter=concurrency_limiter,
+            scheduler=scheduler,
+        )
         self.base_url = base_url
+        self.offers_cache = offers_cache
+        self.conditional_cache = conditional_cache
+        self.instrumentation = instrumentation
+        self.circuit_breaker = circuit_breaker
+        # adapts how many requests are in flight, bulk helpers then only bound
+        # the number of open tasks by its max_limit
+        self.concurrency_limiter = concurrency_limiter
+        # orders requests by priority lane, bulk helpers run in its bulk_lane
+        self.scheduler = scheduler
+        if circuit_breaker is not None and instrumentation is not None:
+            circuit_breaker.add_listener(instrumentation.circuit_changed)
+        self.snapshot_store = snapshot_store
+        self.registered_ids = registered_ids
+        self.registration_queue = registration_queue
+        self._registrations: Dict[UUID, asyncio.Task] = {}
+        self.coalesced_registrations = 0
+        # default time budget in seconds for a whole call, auth and retries included
+        self.deadline = deadline
+        # hedging only applies to idempotent offer reads
+        self.hedge = hedge
+        # trusted responses skip pydantic validation when building models
+        self.trusted_responses = trusted_responses
+        self._decode_offers = (
+            decode_offers_trusted if trusted_responses else decode_offers
+        )
+        self._decode_product_registered = (
+            decode_product_registered_trusted
+            if trusted_responses
+            else decode_product_registered
+        )
+        self._build_offer = TrustedOffer if trusted_responses else Offer.model_validate
+
+    async def __aenter__(self) -> "ProductClient":
+        if self.token_manager.refresh_margin is not None:
+            self.token_manager.start_background_refresh()
+        if self.registration_queue is not None:
+            # drains registrations persisted by a previous run right away
+            await self.registration_queue.start(self._register_queued)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        # every step runs even if an earlier one failed (e.g. a snapshot flush
+        # or saving registered ids), so the refresh task and the connection
+        # pool always close; the first error is raised once all of them ran
+        steps: List[Callable[[], Awaitable[None]]] = []
+        if self.registration_queue is not None:
+            steps.append(self.registration_queue.aclose)
+        if self.offers_cache is not None:
+            steps.append(self.offers_cache.aclose)
+        if self.snapshot_store is not None:
+            steps.append(self.snapshot_store.aclose)
+        if self.registered_ids is not None:
+            steps.append(partial(asyncio.to_thread, self.registered_ids.save))
+        steps.append(self.token_manager.aclose)
+        if self._owns_client:
+            steps.append(self.http_client.aclose)
+        error: Optional[BaseException] = None
+        for step in steps:
+            try:
+                await step()
+            except BaseException as e:
+                if error is not None:
+                    logger.error(f"error closing product client: {e!r}")
+                else:
+                    error = e
+        if error is not None:
+            raise error
+
+    def pool_stats(self) -> Dict[str, int]:
+        return pool_stats(self.http_client)
+
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        if self.concurrency_limiter is None:
+            return None
+        return self.concurrency_limiter.limit
+
+    def _concurrency(self, concurrency: Optional[int]) -> int:
+        if concurrency is not None:
+            return concurrency
+        if self.concurrency_limiter is not None:
+            return self.concurrency_limiter.max_limit
+        return 10
+
+    def registration_stats(self) -> Dict[str, int]:
+        # upstream calls saved by coalescing and by the registered-ID cache
+        cached = self.registered_ids.hits if self.registered_ids is not None else 0
+        return {
+            "coalesced": self.coalesced_registrations,
+            "cached": cached,
+            "saved": self.coalesced_registrations + cached,
+        }
+
+    def _instrumented(self, name: str, **fields):
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.call(name, **fields)
+
+    def _deadline(self, deadline: Optional[float]):
+        return call_deadline(deadline if deadline is not None else self.deadline)
+
+    def _bulk_priority(self, priority: Optional[str]) -> Optional[str]:
+        # bulk helpers fall back to the scheduler's bulk lane, if it has one
+        if priority is not None or self.scheduler is None:
+            return priority
+        return self.scheduler.bulk_lane
+
+    def _priority(self, priority: Optional[str]):
+        # without an explicit priority a call keeps the lane it was made in
+        if priority is None:
+            return nullcontext()
+        return request_priority(priority)
 
-    async def register_product(self, product: Product) -> ProductRegistered:
-        response_data = await self.token_manager.execute_authenticated_request(
+    async def register_product(
+        self,
+        product: Product,
+        deadline: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> ProductRegistered:
+        with (
+            self._instrumented("register_product", product_id=product.id),
+            self._priority(priority),
+        ):
+            async with self._deadline(deadline):
+                if self.registered_ids is not None:
+                    registered_id = self.registered_ids.get(product.id)
+                    if registered_id is not None:
+                        return ProductRegistered(id=registered_id)
+                # concurrent registrations of one product ID share a request,
+                # shield keeps a cancelled caller from cancelling it for others
+                task = self._registrations.get(product.id)
+                if task is None:
+                    task = asyncio.create_task(self._register_product(product))
+                    self._registrations[product.id] = task
+                    task.add_done_callback(
+                        lambda task: self._registration_done(product.id, task)
+                    )
+                else:
+                    self.coalesced_registrations += 1
+                return await asyncio.shield(task)
+
+    async def _register_product(self, product: Product) -> ProductRegistered:
+        registered = await self.token_manager.execute_authenticated_request(
             f"{self.base_url}/products/register",
             "POST",
             product.model_dump(mode="json"),
+            decoder=self._decode_product_registered,
         )
-        return ProductRegistered(**response_data)
+        if self.registered_ids is not None:
+            self.registered_ids.add(product.id, registered.id)
+        return registered
 
-    async def get_product_offers(self, product_id: UUID) -> List[Offer]:
-        response_data = await self.token_manager.execute_authenticated_request(
-            f"{self.base_url}/products/{product_id}/offers", "GET"
-        )
-        return [Offer(**offer_data) for offer_data in response_data]
+    def _registration_done(self, product_id: UUID, task: asyncio.Task) -> None:
+        self._registrations.pop(product_id, None)
+        if not task.cancelled():
+            # every caller may have given up, mark the error as retrieved
+            task.exception()
+
+    async def enqueue_registration(
+        self, product: Product, callback: Optional[Callback] = None
+    ) -> "asyncio.Future[ProductRegistered]":
+        # returns once the product is queued (and persisted), only waits when
+        # the queue is full; the future or callback gets the result later
+        if self.registration_queue is None:
+            raise ValueError("enqueue_registration needs a registration_queue")
+        if not self.registration_queue.started:
+            await self.registration_queue.start(self._register_queued)
+        return await self.registration_queue.enqueue(product, callback)
+
+    async def _register_queued(self, product: Product) -> ProductRegistered:
+        # queue workers register in the background, behind interactive calls
+        with self._priority(self._bulk_priority(None)):
+            return await self.register_product(product)
+
+    async def register_products(
+        self,
+        products: ItemSource[Product],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        priority: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[Product, Union[ProductRegistered, Exception]]]:
+        async for product, result in bounded_gather(
+            in_lane(self.register_product, self._bulk_priority(priority)),
+            products,
+            self._concurrency(concurrency),
+            ordered,
+        ):
+            yield product, result
+
+    async def get_product_offers(
+        self,
+        product_id: UUID,
+        deadline: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> List[Offer]:
+        with (
+            self._instrumented("get_product_offers", product_id=product_id),
+            self._priority(priority),
+        ):
+            async with self._deadline(deadline):
+                if self.offers_cache is None:
+                    return await self._fetch_product_offers(product_id)
+                offers = await self.offers_cache.get_or_fetch(
+                    product_id, lambda: self._fetch_product_offers(product_id)
+                )
+                # callers get their own list so they cannot mutate the cached one
+                return list(offers)
+
+    async def _fetch_product_offers(self, product_id: UUID) -> List[Offer]:
+        def request_offers():
+            url = f"{self.base_url}/products/{product_id}/offers"
+            if self.conditional_cache is None:
+                return self.token_manager.execute_authenticated_request(
+                    url, "GET", decoder=self._decode_offers
+                )
+            return self.token_manager.execute_authenticated_request(
+                url,
+                "GET",
+                headers=self.conditional_cache.request_headers(product_id),
+                response_handler=self._offers_handler(product_id),
+            )
+
+        if self.hedge is None:
+            offers = await request_offers()
+        else:
+            offers = await self.hedge.run(request_offers)
+        if self.snapshot_store is not None:
+            self.snapshot_store.record(product_id, offers)
+        return offers
+
+    async def _poll_product_offers(self, product_id: UUID) -> List[Offer]:
+        # watch_offers needs what the API has now, a TTL cache hit would hide
+        # changes; conditional requests and hedging still apply, and the fresh
+        # list refreshes the TTL cache for other callers
+        with self._instrumented("get_product_offers", product_id=product_id):
+            async with self._deadline(None):
+                offers = await self._fetch_product_offers(product_id)
+        if self.offers_cache is not None:
+            self.offers_cache.set(product_id, offers)
+        return list(offers)
+
+    def _offers_handler(self, product_id: UUID):
+        # the cached list is taken when the request is built, an eviction
+        # while it is in flight cannot leave a 304 without a value
+        cached = self.conditional_cache.get(product_id)
+
+        def handle(response: httpx.Response) -> List[Offer]:
+            if response.status_code == 304 and cached is not None:
+                self.conditional_cache.not_modified += 1
+                return list(cached)
+            response.raise_for_status()
+            offers = self._decode_offers(response.content)
+            self.conditional_cache.modified += 1
+            self.conditional_cache.store(
+                product_id,
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+                offers,
+            )
+            return list(offers)
+
+        return handle
+
+    async def iter_product_offers(
+        self,
+        product_id: UUID,
+        deadline: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> AsyncIterator[Offer]:
+        # parses the offers while they download instead of buffering the whole
+        # array; caches, hedging and snapshots are skipped, the deadline and
+        # the instrumented call only cover getting the response headers
+        url = f"{self.base_url}/products/{product_id}/offers"
+        with (
+            self._instrumented("iter_product_offers", product_id=product_id),
+            self._priority(priority),
+        ):
+            async with self._deadline(deadline):
+                response: httpx.Response = (
+                    await self.token_manager.execute_authenticated_request(
+                        url, "GET", stream=True
+                    )
+                )
+        try:
+            async for item in iter_json_array(response.aiter_bytes()):
+                yield self._build_offer(item)
+        finally:
+            await response.aclose()
+
+    async def warm_offers_cache(self, max_age: Optional[float] = None) -> int:
+        # fills offers_cache from the latest stored snapshots, each entry only
+        # lives for what is left of the cache ttl since it was fetched
+        if self.offers_cache is None or self.snapshot_store is None:
+            raise ValueError("warming needs both offers_cache and snapshot_store")
+        snapshots = await self.snapshot_store.latest_all(max_age)
+        now = time()
+        warmed = 0
+        for product_id, (fetched_at, offers) in snapshots.items():
+            ttl = self.offers_cache.ttl - (now - fetched_at)
+            if ttl <= 0 and not self.offers_cache.stale_while_revalidate:
+                continue
+            self.offers_cache.set(product_id, offers, ttl)
+            warmed += 1
+        return warmed
+
+    async def get_offers_for_many(
+        self,
+        product_ids: ItemSource[UUID],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+        priority: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[UUID, Union[List[Offer], Exception]]]:
+        async for product_id, result in bounded_gather(
+            in_lane(self.get_product_offers, self._bulk_priority(priority)),
+            product_ids,
+            self._concurrency(concurrency),
+            ordered,
+        ):
+            yield product_id, result
+
+    async def watch_offers(
+        self,
+        product_ids: Iterable[UUID],
+        interval: float = 30.0,
+        min_interval: float = 5.0,
+        max_interval: float = 300.0,
+        concurrency: Optional[int] = None,
+        emit_initial: bool = False,
+        priority: Optional[str] = None,
+    ) -> AsyncIterator[OfferChange]:
+        async for change in watch_offers(
+            in_lane(self._poll_product_offers, self._bulk_priority(priority)),
+            product_ids,
+            interval=interval,
+            min_interval=min_interval,
+            max_interval=max_interval,
+            concurrency=self._concurrency(concurrency),
+            emit_initial=emit_initial,
+        ):
+            yield change
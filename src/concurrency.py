@@ -0,0 +1,134 @@
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+
+def is_overload(exception: BaseException) -> bool:
+    if isinstance(exception, httpx.TimeoutException):
+        return True
+    return isinstance(exception, httpx.HTTPStatusError) and (
+        exception.response.status_code == 429 or exception.response.status_code >= 500
+    )
+
+
+class AdaptiveLimiter:
+    # AIMD limit on requests in flight: every healthy response adds
+    # increase / limit (so about `increase` per round trip), a timeout, 429,
+    # 5xx or a response slower than latency_tolerance times the usual latency
+    # of its endpoint multiplies the limit by decrease_factor. Only requests
+    # started after the last cut can cut again, one overload burst costs one cut
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: Optional[float] = 3.0,
+        latency_smoothing: float = 0.1,
+        latency_warmup: int = 10,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min <= initial <= max")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if not 0 < latency_smoothing <= 1:
+            raise ValueError("latency_smoothing must be between 0 and 1")
+        if latency_warmup < 0:
+            raise ValueError("latency_warmup must not be negative")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latency_smoothing = latency_smoothing
+        self.latency_warmup = latency_warmup
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters: deque = deque()
+        self._last_decrease = float("-inf")
+        # endpoint -> (moving average of its latency, responses seen)
+        self._latency: Dict[Optional[str], Tuple[float, int]] = {}
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> float:
+        # returns the start time to hand back to release()
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the cancellation
+                self._in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        return monotonic()
+
+    def latency_baseline(self, endpoint: Optional[str] = None) -> Optional[float]:
+        baseline = self._latency.get(endpoint)
+        return baseline[0] if baseline is not None else None
+
+    def release(
+        self,
+        started: float,
+        error: Optional[BaseException] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        self._in_flight -= 1
+        if error is None:
+            overloaded = self._is_slow(endpoint, monotonic() - started)
+        else:
+            overloaded = is_overload(error)
+        if overloaded:
+            if started >= self._last_decrease:
+                self._limit = max(self._limit * self.decrease_factor, self.min_limit)
+                self._last_decrease = monotonic()
+                self.decreases += 1
+        elif error is None and self._limit < self.max_limit:
+            self._limit = min(self._limit + self.increase / self._limit, self.max_limit)
+            self.increases += 1
+        self._wake()
+
+    def _is_slow(self, endpoint: Optional[str], latency: float) -> bool:
+        # judged against a moving average per endpoint, not the fastest
+        # response ever seen: a quick /auth or one lucky response must not
+        # make every normal response look slow, and the baseline follows the
+        # upstream as it drifts; the first responses of an endpoint only set it
+        if self.latency_tolerance is None:
+            return False
+        baseline, samples = self._latency.get(endpoint, (latency, 0))
+        slow = (
+            samples >= self.latency_warmup
+            and latency > baseline * self.latency_tolerance
+        )
+        self._latency[endpoint] = (
+            baseline + (latency - baseline) * self.latency_smoothing,
+            samples + 1,
+        )
+        return slow
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
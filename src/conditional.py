@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from typing import Dict, Generic, Hashable, NamedTuple, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Validated(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    value: object
+
+
+class ConditionalCache(Generic[K, V]):
+    # last parsed response per key together with its ETag / Last-Modified,
+    # so the next request can be conditional and a 304 reuses the value
+    # without downloading or parsing it again; least recently used keys are
+    # dropped past max_size
+
+    def __init__(self, max_size: int = 1024) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._entries: OrderedDict[K, Validated] = OrderedDict()
+        self.not_modified = 0
+        self.modified = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "not_modified": self.not_modified,
+            "modified": self.modified,
+        }
+
+    def request_headers(self, key: K) -> Dict[str, str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag is not None:
+            headers["if-none-match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["if-modified-since"] = entry.last_modified
+        return headers
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def store(
+        self, key: K, etag: Optional[str], last_modified: Optional[str], value: V
+    ) -> None:
+        if etag is None and last_modified is None:
+            # nothing to revalidate against
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = Validated(etag, last_modified, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
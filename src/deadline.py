@@ -0,0 +1,32 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("dx_heroes_deadline", default=None)
+
+
+@asynccontextmanager
+async def call_deadline(timeout: Optional[float]) -> AsyncIterator[None]:
+    # one time budget for everything awaited inside (token acquisition,
+    # retries and their backoff), nested deadlines never extend an outer one
+    if timeout is None:
+        yield
+        return
+    expires_at = asyncio.get_running_loop().time() + timeout
+    outer = _deadline.get()
+    if outer is not None:
+        expires_at = min(expires_at, outer)
+    token = _deadline.set(expires_at)
+    try:
+        async with asyncio.timeout_at(expires_at):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - asyncio.get_running_loop().time()
@@ -0,0 +1,190 @@
+import heapq
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from typing import (
+    AsyncIterable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from uuid import UUID
+
+from .models import Offer, TrustedOffer
+
+OfferLike = Union[Offer, TrustedOffer]
+
+
+class OfferRow(NamedTuple):
+    product_id: UUID
+    offer_id: UUID
+    price: int
+    items_in_stock: int
+
+
+class OffersFrame:
+    # offers of many products in flat columns: offers of the product at row i
+    # live in [offsets[i], offsets[i + 1]) of offer_ids/price/items_in_stock,
+    # offer IDs are stored as 16 raw bytes each
+    __slots__ = (
+        "product_ids",
+        "offsets",
+        "offer_ids",
+        "price",
+        "items_in_stock",
+        "failed",
+        "_rows",
+    )
+
+    def __init__(self) -> None:
+        self.product_ids: List[UUID] = []
+        self.offsets = array("q", [0])
+        self.offer_ids = bytearray()
+        self.price = array("q")
+        self.items_in_stock = array("q")
+        self.failed: Dict[UUID, Exception] = {}
+        self._rows: Dict[UUID, int] = {}
+
+    @classmethod
+    def from_offers(
+        cls, offers_by_product: Iterable[Tuple[UUID, Sequence[OfferLike]]]
+    ) -> "OffersFrame":
+        frame = cls()
+        for product_id, offers in offers_by_product:
+            frame.add(product_id, offers)
+        return frame
+
+    @classmethod
+    async def from_stream(
+        cls,
+        results: AsyncIterable[Tuple[UUID, Union[Sequence[OfferLike], Exception]]],
+    ) -> "OffersFrame":
+        # fills the frame from ProductClient.get_offers_for_many, failed
+        # products are kept in `failed` instead of the columns
+        frame = cls()
+        async for product_id, offers in results:
+            if isinstance(offers, Exception):
+                frame.failed[product_id] = offers
+            else:
+                frame.add(product_id, offers)
+        return frame
+
+    def add(self, product_id: UUID, offers: Sequence[OfferLike]) -> None:
+        if product_id in self._rows:
+            raise ValueError(f"offers of product {product_id} already added")
+        self._rows[product_id] = len(self.product_ids)
+        self.product_ids.append(product_id)
+        for offer in offers:
+            self.offer_ids += offer.id.bytes
+            self.price.append(offer.price)
+            self.items_in_stock.append(offer.items_in_stock)
+        self.offsets.append(len(self.price))
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @property
+    def product_count(self) -> int:
+        return len(self.product_ids)
+
+    def nbytes(self) -> int:
+        return (
+            len(self.offer_ids)
+            + (len(self.offsets) + len(self.price) + len(self.items_in_stock)) * 8
+        )
+
+    def offer_id(self, index: int) -> UUID:
+        return UUID(bytes=bytes(self.offer_ids[index * 16 : index * 16 + 16]))
+
+    def row(self, index: int) -> OfferRow:
+        product_row = self._product_row(index)
+        return OfferRow(
+            self.product_ids[product_row],
+            self.offer_id(index),
+            self.price[index],
+            self.items_in_stock[index],
+        )
+
+    def offers(self, product_id: UUID) -> List[OfferRow]:
+        start, end = self._bounds(self._rows[product_id])
+        return [self.row(index) for index in range(start, end)]
+
+    def min_price(self) -> Dict[UUID, Optional[int]]:
+        return {
+            product_id: min(self.price[start:end]) if end > start else None
+            for product_id, (start, end) in self._segments()
+        }
+
+    def argmin_price(self) -> Dict[UUID, Optional[int]]:
+        return {
+            product_id: self._argmin(start, end)
+            for product_id, (start, end) in self._segments()
+        }
+
+    def cheapest(self, product_id: UUID) -> Optional[OfferRow]:
+        index = self._argmin(*self._bounds(self._rows[product_id]))
+        return self.row(index) if index is not None else None
+
+    def price_spread(self) -> Dict[UUID, Optional[int]]:
+        spreads: Dict[UUID, Optional[int]] = {}
+        for product_id, (start, end) in self._segments():
+            prices = self.price[start:end]
+            spreads[product_id] = max(prices) - min(prices) if prices else None
+        return spreads
+
+    def total_stock(self) -> Dict[UUID, int]:
+        return {
+            product_id: sum(self.items_in_stock[start:end])
+            for product_id, (start, end) in self._segments()
+        }
+
+    def top_cheapest(self, k: int, in_stock_only: bool = False) -> List[OfferRow]:
+        candidates = zip(self.price, range(len(self.price)))
+        if in_stock_only:
+            candidates = compress(candidates, self.items_in_stock)
+        return [self.row(index) for _, index in heapq.nsmallest(k, candidates)]
+
+    def in_stock(self) -> "OffersFrame":
+        mask = [items > 0 for items in self.items_in_stock]
+        frame = OffersFrame()
+        frame.product_ids = list(self.product_ids)
+        frame._rows = dict(self._rows)
+        frame.failed = dict(self.failed)
+        frame.price = array("q", compress(self.price, mask))
+        frame.items_in_stock = array("q", compress(self.items_in_stock, mask))
+        frame.offer_ids = bytearray().join(
+            compress(
+                (
+                    self.offer_ids[start : start + 16]
+                    for start in range(0, len(self.offer_ids), 16)
+                ),
+                mask,
+            )
+        )
+        kept = 0
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            kept += sum(mask[start:end])
+            frame.offsets.append(kept)
+        return frame
+
+    def _bounds(self, product_row: int) -> Tuple[int, int]:
+        return self.offsets[product_row], self.offsets[product_row + 1]
+
+    def _segments(self) -> Iterable[Tuple[UUID, Tuple[int, int]]]:
+        return zip(self.product_ids, zip(self.offsets, self.offsets[1:]))
+
+    def _product_row(self, index: int) -> int:
+        if not 0 <= index < len(self.price):
+            raise IndexError("offer index out of range")
+        return bisect_right(self.offsets, index) - 1
+
+    def _argmin(self, start: int, end: int) -> Optional[int]:
+        if end == start:
+            return None
+        prices = self.price[start:end]
+        return start + prices.index(min(prices))
@@ -0,0 +1,73 @@
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Awaitable, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    # sends a second copy of an idempotent request once the first one is
+    # slower than the given percentile of recent latencies, the first response
+    # wins and the other request is cancelled
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        window: int = 1000,
+        min_samples: int = 20,
+        min_delay: float = 0.005,
+        recompute_every: int = 50,
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.recompute_every = recompute_every
+        self._latencies: deque = deque(maxlen=window)
+        self._observed = 0
+        self._delay: Optional[float] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def observe(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+        self._observed += 1
+        if len(self._latencies) >= self.min_samples and (
+            self._delay is None or self._observed % self.recompute_every == 0
+        ):
+            ordered = sorted(self._latencies)
+            index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+            self._delay = max(ordered[index], self.min_delay)
+
+    @property
+    def delay(self) -> Optional[float]:
+        return self._delay
+
+    async def run(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        start = perf_counter()
+        first = asyncio.ensure_future(attempt())
+        tasks = {first}
+        try:
+            if self._delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=self._delay)
+                if not done:
+                    self.hedged += 1
+                    tasks.add(asyncio.ensure_future(attempt()))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self.observe(perf_counter() - start)
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
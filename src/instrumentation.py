@@ -0,0 +1,134 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import httpx
+from loguru import logger
+
+Hook = Callable[[str, Dict[str, Any]], None]
+
+# httpcore trace events that open and close the connect and time-to-first-byte
+# phases, for both HTTP/1.1 and HTTP/2 connections
+_TRACE_PHASES = {
+    "connection.connect_tcp.started": ("connect", True),
+    "connection.connect_tcp.complete": ("connect", False),
+    "connection.start_tls.started": ("connect", True),
+    "connection.start_tls.complete": ("connect", False),
+    "http11.send_request_headers.started": ("ttfb", True),
+    "http11.receive_response_headers.complete": ("ttfb", False),
+    "http2.send_request_headers.started": ("ttfb", True),
+    "http2.receive_response_headers.complete": ("ttfb", False),
+}
+
+
+class CallRecord:
+    __slots__ = ("instrumentation", "name", "phases", "retries", "_started")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str) -> None:
+        self.instrumentation = instrumentation
+        self.name = name
+        self.phases: Dict[str, float] = {}
+        self.retries = 0
+        self._started: Dict[str, float] = {}
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        phase = _TRACE_PHASES.get(event_name)
+        if phase is None:
+            return
+        name, started = phase
+        if started:
+            self._started[name] = perf_counter()
+        elif name in self._started:
+            self.add_phase(name, perf_counter() - self._started.pop(name))
+
+
+_current_call: ContextVar[Optional[CallRecord]] = ContextVar(
+    "dx_heroes_current_call", default=None
+)
+
+
+def current_call() -> Optional[CallRecord]:
+    return _current_call.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    record = _current_call.get()
+    if record is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        record.add_phase(name, perf_counter() - start)
+
+
+@contextmanager
+def detached() -> Iterator[None]:
+    # requests made on behalf of many callers (e.g. a shared token refresh)
+    # must not be attributed to the call that happened to start them
+    token = _current_call.set(None)
+    try:
+        yield
+    finally:
+        _current_call.reset(token)
+
+
+class Instrumentation:
+    def __init__(self, hooks: Iterable[Hook] = ()) -> None:
+        self.hooks: List[Hook] = list(hooks)
+
+    def add_hook(self, hook: Hook) -> None:
+        self.hooks.append(hook)
+
+    def emit(self, event: str, **fields: Any) -> None:
+        for hook in self.hooks:
+            try:
+                hook(event, fields)
+            except Exception as e:
+                logger.error(f"instrumentation hook failed on {event}: {e}")
+
+    def circuit_changed(self, endpoint: str, previous: str, state: str) -> None:
+        # CircuitBreaker listener; the bound method compares equal for the same
+        # instrumentation, so clients sharing both register it only once
+        self.emit("circuit", endpoint=endpoint, previous=previous, state=state)
+
+    @contextmanager
+    def call(self, name: str, **fields: Any) -> Iterator[CallRecord]:
+        record = CallRecord(self, name)
+        token = _current_call.set(record)
+        start = perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            yield record
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_call.reset(token)
+            self.emit(
+                "call",
+                name=name,
+                duration=perf_counter() - start,
+                phases=record.phases,
+                retries=record.retries,
+                error=error,
+                **fields,
+            )
+
+
+def pool_stats(client: httpx.AsyncClient) -> Dict[str, int]:
+    # reads httpcore's pool, transports without one (e.g. MockTransport) report 0
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "active": len(connections) - idle,
+    }
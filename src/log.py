@@ -0,0 +1,26 @@
+from random import random
+from typing import Any, Optional
+
+from loguru import logger
+
+# per-request messages go through log_hot_path: they are formatted by loguru
+# only when a sink accepts the level, and can be sampled or switched off
+_level: Optional[str] = "DEBUG"
+_sample_rate = 1.0
+
+
+def configure_hot_path_logging(
+    level: Optional[str] = "DEBUG", sample_rate: float = 1.0
+) -> None:
+    # level=None drops hot-path records before loguru is involved at all
+    global _level, _sample_rate
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("sample_rate must be between 0 and 1")
+    _level = level
+    _sample_rate = sample_rate
+
+
+def log_hot_path(message: str, *args: Any) -> None:
+    if _level is None or (_sample_rate < 1.0 and random() >= _sample_rate):
+        return
+    logger.opt(depth=1).log(_level, message, *args)
@@ -1,6 +1,8 @@
+from typing import Any, Dict, List, Union
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import from_json
 
 
 class Product(BaseModel):
@@ -17,3 +19,50 @@ class Offer(BaseModel):
     id: UUID
     price: int
     items_in_stock: int
+
+
+class TrustedOffer:
+    # unvalidated stand-in for Offer with the same attributes, built straight
+    # from the decoded JSON; id is turned into a UUID on first access
+    __slots__ = ("_id", "price", "items_in_stock")
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._id: Union[str, UUID] = data["id"]
+        self.price: int = data["price"]
+        self.items_in_stock: int = data["items_in_stock"]
+
+    @property
+    def id(self) -> UUID:
+        if not isinstance(self._id, UUID):
+            self._id = UUID(self._id)
+        return self._id
+
+    def to_offer(self) -> Offer:
+        return Offer(id=self.id, price=self.price, items_in_stock=self.items_in_stock)
+
+    def __repr__(self) -> str:
+        return (
+            f"TrustedOffer(id={self._id!r}, price={self.price}, "
+            f"items_in_stock={self.items_in_stock})"
+        )
+
+
+# built once, validate_json parses and validates the raw body in a single pass
+_offer_list_adapter = TypeAdapter(List[Offer])
+
+
+def decode_offers(content: bytes) -> List[Offer]:
+    return _offer_list_adapter.validate_json(content)
+
+
+def decode_offers_trusted(content: bytes) -> List[TrustedOffer]:
+    # skips validation, only for upstreams whose responses are trusted
+    return list(map(TrustedOffer, from_json(content)))
+
+
+def decode_product_registered(content: bytes) -> ProductRegistered:
+    return ProductRegistered.model_validate_json(content)
+
+
+def decode_product_registered_trusted(content: bytes) -> ProductRegistered:
+    return ProductRegistered.model_construct(id=UUID(from_json(content)["id"]))
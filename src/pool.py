@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+from uuid import UUID
+
+import httpx
+
+from .client import DEFAULT_BASE_URL, ProductClient
+from .models import Offer, Product, ProductRegistered
+from .request import create_http_client
+
+RefreshTokens = Union[Mapping[Hashable, str], Callable[[Hashable], str]]
+TenantState = Callable[[Hashable], Mapping[str, Any]]
+
+# ProductClient arguments keyed by product ID (or holding a token): one
+# instance shared by every tenant would mix their data, and evicting a tenant
+# would close it for all the others
+TENANT_STATE = frozenset(
+    {
+        "offers_cache",
+        "conditional_cache",
+        "snapshot_store",
+        "registered_ids",
+        "registration_queue",
+        "token_store",
+    }
+)
+
+
+class _Tenant:
+    __slots__ = ("client", "leases")
+
+    def __init__(self, client: ProductClient) -> None:
+        self.client = client
+        self.leases = 0
+
+
+class ProductClientPool:
+    # one ProductClient per tenant, all on a single shared HTTP connection
+    # pool; tokens stay in memory per tenant (no shared token file). Past
+    # max_tenants the least recently used tenant that is not in use is
+    # closed, it gets a fresh client and token on its next call. Caches,
+    # stores and queues are built per tenant by tenant_state, every other
+    # keyword argument is shared by all tenants
+
+    def __init__(
+        self,
+        refresh_tokens: RefreshTokens,
+        base_url: str = DEFAULT_BASE_URL,
+        max_tenants: int = 100,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        timeout: Optional[httpx.Timeout] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        tenant_state: Optional[TenantState] = None,
+        **client_kwargs: Any,
+    ) -> None:
+        if max_tenants < 1:
+            raise ValueError("max_tenants must be at least 1")
+        shared_state = TENANT_STATE.intersection(client_kwargs)
+        if shared_state:
+            raise ValueError(
+                f"{', '.join(sorted(shared_state))} would be shared by every "
+                "tenant, build it per tenant with tenant_state"
+            )
+        self.refresh_tokens = refresh_tokens
+        self.base_url = base_url
+        self.max_tenants = max_tenants
+        self.client_kwargs = client_kwargs
+        self.tenant_state = tenant_state
+        self._owns_client = client is None
+        self.http_client = (
+            client if client is not None else create_http_client(limits, http2, timeout)
+        )
+        self._tenants: OrderedDict[Hashable, _Tenant] = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def __contains__(self, tenant: Hashable) -> bool:
+        return tenant in self._tenants
+
+    async def __aenter__(self) -> "ProductClientPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+
+    def tenants(self) -> List[Hashable]:
+        # least recently used first
+        return list(self._tenants)
+
+    def stats(self) -> Dict[str, int]:
+        return {"tenants": len(self._tenants), "evictions": self.evictions}
+
+    def _refresh_token(self, tenant: Hashable) -> str:
+        if callable(self.refresh_tokens):
+            return self.refresh_tokens(tenant)
+        return self.refresh_tokens[tenant]
+
+    def _client_kwargs(self, tenant: Hashable) -> Dict[str, Any]:
+        if self.tenant_state is None:
+            return self.client_kwargs
+        # fresh objects, owned (and closed on eviction) by this tenant only
+        return {**self.client_kwargs, **self.tenant_state(tenant)}
+
+    @asynccontextmanager
+    async def tenant(self, tenant: Hashable) -> AsyncIterator[ProductClient]:
+        entry = self._tenants.get(tenant)
+        if entry is None:
+            client = ProductClient(
+                self._refresh_token(tenant),
+                self.base_url,
+                client=self.http_client,
+                token_file=None,
+                **self._client_kwargs(tenant),
+            )
+            # registered before entering so concurrent calls share the client
+            entry = self._tenants[tenant] = _Tenant(client)
+            await client.__aenter__()
+        else:
+            self._tenants.move_to_end(tenant)
+        entry.leases += 1
+        try:
+            await self._evict_idle()
+            yield entry.client
+        finally:
+            entry.leases -= 1
+
+    async def _evict_idle(self) -> None:
+        excess = len(self._tenants) - self.max_tenants
+        if excess <= 0:
+            return
+        idle = [tenant for tenant, entry in self._tenants.items() if entry.leases == 0][
+            :excess
+        ]
+        for tenant in idle:
+            entry = self._tenants.pop(tenant)
+            self.evictions += 1
+            await entry.client.aclose()
+
+    async def register_product(
+        self, tenant: Hashable, product: Product, **kwargs: Any
+    ) -> ProductRegistered:
+        async with self.tenant(tenant) as client:
+            return await client.register_product(product, **kwargs)
+
+    async def get_product_offers(
+        self, tenant: Hashable, product_id: UUID, **kwargs: Any
+    ) -> List[Offer]:
+        async with self.tenant(tenant) as client:
+            return await client.get_product_offers(product_id, **kwargs)
+
+    async def evict(self, tenant: Hashable) -> None:
+        entry = self._tenants.pop(tenant, None)
+        if entry is not None:
+            await entry.client.aclose()
+
+    async def aclose(self) -> None:
+        # a tenant failing to close must not keep the others or the shared
+        # connection pool open, the first error is raised at the end
+        tenants, self._tenants = self._tenants, OrderedDict()
+        error: Optional[BaseException] = None
+        for entry in tenants.values():
+            try:
+                await entry.client.aclose()
+            except BaseException as e:
+                error = error or e
+        if self._owns_client:
+            await self.http_client.aclose()
+        if error is not None:
+            raise error
@@ -0,0 +1,64 @@
+import asyncio
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self) -> None:
+        # the lock makes waiters queue up in arrival order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        endpoint_limits: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+    ) -> None:
+        self._bucket = TokenBucket(rate, burst) if rate is not None else None
+        self._endpoint_buckets = {
+            endpoint: TokenBucket(endpoint_rate, endpoint_burst)
+            for endpoint, (endpoint_rate, endpoint_burst) in (
+                endpoint_limits or {}
+            ).items()
+        }
+        self._resume_at = 0.0
+
+    def pause(self, seconds: float) -> None:
+        # called when upstream answers with Retry-After, holds back every
+        # request of this limiter instead of letting them run into more 429s
+        self._resume_at = max(self._resume_at, monotonic() + seconds)
+
+    async def acquire(self, endpoint: Optional[str] = None) -> None:
+        delay = self._resume_at - monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint_bucket = self._endpoint_buckets.get(endpoint)
+        if endpoint_bucket is not None:
+            await endpoint_bucket.acquire()
+        if self._bucket is not None:
+            await self._bucket.acquire()
@@ -0,0 +1,184 @@
+import asyncio
+import inspect
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+
+from loguru import logger
+
+from .models import Product, ProductRegistered
+
+RegistrationResult = Union[ProductRegistered, BaseException]
+Callback = Callable[[Product, RegistrationResult], Any]
+Register = Callable[[Product], Awaitable[ProductRegistered]]
+_Item = Tuple[Optional[int], Product, asyncio.Future, Optional[Callback]]
+
+
+class RegistrationQueue:
+    # products waiting for registration, drained by `concurrency` workers;
+    # capacity counts queued and in-flight items, enqueue waits while it is
+    # used up. With a path every item is written to SQLite before enqueue
+    # returns and deleted once handled, so a restart picks up what was left
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        concurrency: int = 10,
+        path: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.capacity = capacity
+        self.concurrency = concurrency
+        self.path = Path(os.path.expanduser(path)) if path is not None else None
+        self._slots = asyncio.Semaphore(capacity)
+        self._queue: asyncio.Queue[_Item] = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._register: Optional[Register] = None
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        if self.path is not None:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS pending_registrations ("
+                    "item_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    "product TEXT NOT NULL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() + self._in_flight
+
+    async def start(self, register: Register) -> int:
+        # returns how many persisted items were picked up again
+        if self._workers:
+            return 0
+        self._register = register
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self.concurrency)
+        ]
+        if self.path is None:
+            return 0
+        rows = await asyncio.to_thread(
+            self._query, "SELECT item_id, product FROM pending_registrations"
+        )
+        for item_id, product in rows:
+            await self._slots.acquire()
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait(
+                (item_id, Product.model_validate_json(product), future, None)
+            )
+        if rows:
+            logger.info(f"resumed {len(rows)} pending registrations")
+        return len(rows)
+
+    async def enqueue(
+        self, product: Product, callback: Optional[Callback] = None
+    ) -> "asyncio.Future[ProductRegistered]":
+        if not self._workers:
+            raise RuntimeError("registration queue is not started")
+        await self._slots.acquire()
+        try:
+            item_id = (
+                await asyncio.to_thread(self._insert, product.model_dump_json())
+                if self.path is not None
+                else None
+            )
+        except BaseException:
+            self._slots.release()
+            raise
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item_id, product, future, callback))
+        return future
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    async def aclose(self) -> None:
+        # unfinished persisted items stay in the database for the next start
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        while not self._queue.empty():
+            _, _, future, _ = self._queue.get_nowait()
+            future.cancel()
+            self._queue.task_done()
+
+    async def _work(self) -> None:
+        while True:
+            item_id, product, future, callback = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await self._handle(item_id, product, future, callback)
+            finally:
+                self._in_flight -= 1
+                self._slots.release()
+                self._queue.task_done()
+
+    async def _handle(
+        self,
+        item_id: Optional[int],
+        product: Product,
+        future: asyncio.Future,
+        callback: Optional[Callback],
+    ) -> None:
+        try:
+            result: RegistrationResult = await self._register(product)
+            self.completed += 1
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            logger.error(f"queued registration of {product.id} failed: {e}")
+            result = e
+            self.failed += 1
+            if not future.done():
+                future.set_exception(e)
+                # nobody may be waiting on the future
+                future.exception()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        if item_id is not None:
+            try:
+                await asyncio.to_thread(self._delete, item_id)
+            except sqlite3.Error as e:
+                # the item is registered again after a restart, the worker
+                # and the callback carry on
+                logger.error(f"could not remove queued registration {item_id}: {e}")
+        if callback is not None:
+            try:
+                outcome = callback(product, result)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except Exception as e:
+                logger.error(f"registration callback failed for {product.id}: {e}")
+
+    def _insert(self, product: str) -> int:
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(
+                "INSERT INTO pending_registrations (product) VALUES (?)", (product,)
+            ).lastrowid
+
+    def _delete(self, item_id: int) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM pending_registrations WHERE item_id = ?", (item_id,)
+            )
+
+    def _query(self, sql: str) -> List[Tuple[Any, ...]]:
+        with closing(self._connect()) as conn:
+            return conn.execute(sql).fetchall()
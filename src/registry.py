@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+from uuid import UUID
+
+from loguru import logger
+
+
+class RegisteredIdCache:
+    # product IDs already registered upstream (mapped to the returned ID),
+    # least recently used ones are dropped past max_size; with a path the
+    # cache is loaded on creation and written back by save()
+
+    def __init__(
+        self,
+        max_size: int = 100_000,
+        path: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.path = Path(os.path.expanduser(path)) if path is not None else None
+        self._ids: OrderedDict[UUID, UUID] = OrderedDict()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, product_id: UUID) -> bool:
+        return product_id in self._ids
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._ids), "hits": self.hits, "misses": self.misses}
+
+    def get(self, product_id: UUID) -> Optional[UUID]:
+        registered_id = self._ids.get(product_id)
+        if registered_id is None:
+            self.misses += 1
+            return None
+        self._ids.move_to_end(product_id)
+        self.hits += 1
+        return registered_id
+
+    def add(self, product_id: UUID, registered_id: UUID) -> None:
+        self._ids[product_id] = registered_id
+        self._ids.move_to_end(product_id)
+        while len(self._ids) > self.max_size:
+            self._ids.popitem(last=False)
+        self._dirty = True
+
+    def load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"error loading registered product IDs: {e}")
+            return
+        for product_id, registered_id in data.items():
+            self.add(UUID(product_id), UUID(registered_id))
+        self._dirty = False
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        data = {
+            str(product_id): str(registered_id)
+            for product_id, registered_id in self._ids.items()
+        }
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}."
+            )
+            with os.fdopen(fd, "w") as tmp_file:
+                tmp_file.write(json.dumps(data))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"error saving registered product IDs: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._dirty = False
@@ -1,45 +1,368 @@
 import json
-from typing import Any, Dict, Optional
+import re
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from functools import partial
+from importlib.util import find_spec
+from time import time
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 import httpx
 from loguru import logger
+from pydantic import ValidationError
 from tenacity import (
+    RetryCallState,
     retry,
-    retry_if_exception_type,
+    retry_if_exception,
     stop_after_attempt,
-    wait_exponential,
+    wait_exponential_jitter,
 )
+from tenacity.wait import wait_base
 
+from .breaker import CircuitBreaker
+from .concurrency import AdaptiveLimiter
+from .deadline import remaining
+from .instrumentation import current_call, phase
+from .log import log_hot_path
+from .ratelimit import RateLimiter
+from .scheduler import PriorityScheduler
 
-def get_headers(token: str) -> Dict[str, str]:
-    headers = {"Bearer": token, "accept": "application/json"}
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+RETRYABLE_STATUS_CODES = {429, 503}
+# httpx only decodes brotli when one of the optional packages is installed
+ACCEPT_ENCODING = (
+    "gzip, deflate, br"
+    if find_spec("brotli") is not None or find_spec("brotlicffi") is not None
+    else "gzip, deflate"
+)
+MAX_RETRY_AFTER = 60.0
+
+_UUID_SEGMENT = re.compile(
+    r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+
+def create_http_client(
+    limits: Optional[httpx.Limits] = None,
+    http2: bool = False,
+    timeout: Optional[httpx.Timeout] = None,
+) -> httpx.AsyncClient:
+    # http2 needs the optional `h2` package (pip install "httpx[http2]")
+    return httpx.AsyncClient(
+        limits=limits or DEFAULT_LIMITS,
+        http2=http2,
+        timeout=timeout or DEFAULT_TIMEOUT,
+    )
+
+
+def endpoint_key(url: str, base_url: str = "") -> str:
+    path = url[len(base_url) :] if base_url and url.startswith(base_url) else url
+    return _UUID_SEGMENT.sub("/{id}", httpx.URL(path).path)
+
+
+def get_headers(
+    token: str, extra_headers: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    headers = {
+        "Bearer": token,
+        "accept": "application/json",
+        "accept-encoding": ACCEPT_ENCODING,
+    }
+    if extra_headers:
+        headers.update(extra_headers)
     return headers
 
 
+def parse_retry_after(value: Any) -> Optional[float]:
+    if not isinstance(value, str) or not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_retry_after(exception: BaseException) -> Optional[float]:
+    if not isinstance(exception, httpx.HTTPStatusError):
+        return None
+    retry_after = parse_retry_after(exception.response.headers.get("Retry-After"))
+    return min(retry_after, MAX_RETRY_AFTER) if retry_after is not None else None
+
+
+def is_retryable(exception: BaseException) -> bool:
+    if isinstance(exception, (httpx.ConnectTimeout, httpx.ConnectError)):
+        return True
+    return (
+        isinstance(exception, httpx.HTTPStatusError)
+        and exception.response.status_code in RETRYABLE_STATUS_CODES
+    )
+
+
+class wait_retry_after(wait_base):
+    def __init__(self, fallback: wait_base) -> None:
+        self.fallback = fallback
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        retry_after = get_retry_after(retry_state.outcome.exception())
+        if retry_after is not None:
+            return retry_after
+        return self.fallback(retry_state)
+
+
+def stop_before_deadline(retry_state: RetryCallState) -> bool:
+    # gives up instead of sleeping into a backoff that outlasts the call deadline
+    time_left = remaining()
+    return time_left is not None and retry_state.upcoming_sleep >= time_left
+
+
+def report_retry(retry_state: RetryCallState) -> None:
+    record = current_call()
+    if record is None:
+        return
+    record.retries += 1
+    record.instrumentation.emit(
+        "retry",
+        name=record.name,
+        attempt=retry_state.attempt_number,
+        wait=retry_state.next_action.sleep,
+        error=retry_state.outcome.exception(),
+    )
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    url: str,
+    method: str,
+    token,
+    data: Optional[Dict[str, Any]] = None,
+    decoder: Optional[Callable[[bytes], Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    response_handler: Optional[Callable[[httpx.Response], Any]] = None,
+    stream: bool = False,
+) -> Any:
+    record = current_call()
+    if stream:
+        return await _open_stream(client, url, method, token, data, headers, record)
+    if record is None:
+        response = await client.request(
+            method, url, headers=get_headers(token, headers), json=data
+        )
+    else:
+        response = await client.request(
+            method,
+            url,
+            headers=get_headers(token, headers),
+            json=data,
+            extensions={"trace": record.trace},
+        )
+    log_hot_path("{} {} -> {}", method, url, response.status_code)
+    # a response handler deals with 304 itself, conditional requests expect it
+    if response_handler is None or response.status_code != 304:
+        response.raise_for_status()
+    with phase("parse"):
+        if response_handler is not None:
+            return response_handler(response)
+        if decoder is not None:
+            return decoder(response.content)
+        return response.json()
+
+
+async def _open_stream(
+    client: httpx.AsyncClient,
+    url: str,
+    method: str,
+    token,
+    data: Optional[Dict[str, Any]],
+    headers: Optional[Dict[str, str]],
+    record,
+) -> httpx.Response:
+    # hands back the response with its body unread, the caller closes it
+    request = client.build_request(
+        method,
+        url,
+        headers=get_headers(token, headers),
+        json=data,
+        extensions={"trace": record.trace} if record is not None else None,
+    )
+    response = await client.send(request, stream=True)
+    log_hot_path("{} {} -> {}", method, url, response.status_code)
+    if response.is_error:
+        # error bodies are small, read them so the error log can show them
+        await response.aread()
+        await response.aclose()
+        response.raise_for_status()
+    return response
+
+
 @retry(
-    retry=retry_if_exception_type((httpx.ConnectTimeout, httpx.ConnectError)),
-    wait=wait_exponential(),
-    stop=stop_after_attempt(5),
+    retry=retry_if_exception(is_retryable),
+    wait=wait_retry_after(wait_exponential_jitter(initial=1, max=30)),
+    stop=stop_after_attempt(5) | stop_before_deadline,
+    before_sleep=report_retry,
 )
 async def perform_request(
-    url: str, method: str, token, data: Optional[Dict[str, Any]] = None
+    url: str,
+    method: str,
+    token,
+    data: Optional[Dict[str, Any]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    endpoint: Optional[str] = None,
+    decoder: Optional[Callable[[bytes], Any]] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    concurrency_limiter: Optional[AdaptiveLimiter] = None,
+    headers: Optional[Dict[str, str]] = None,
+    response_handler: Optional[Callable[[httpx.Response], Any]] = None,
+    stream: bool = False,
+    scheduler: Optional[PriorityScheduler] = None,
+) -> Any:
+    # checked on every attempt, so an opening circuit also cuts retries short
+    guard = (
+        circuit_breaker.guard(endpoint or url)
+        if circuit_breaker is not None
+        else nullcontext()
+    )
+    with guard:
+        return await _perform_request(
+            url,
+            method,
+            token,
+            data,
+            client,
+            rate_limiter,
+            concurrency_limiter,
+            endpoint,
+            decoder,
+            headers,
+            response_handler,
+            stream,
+            scheduler,
+        )
+
+
+async def _perform_request(
+    url: str,
+    method: str,
+    token,
+    data: Optional[Dict[str, Any]],
+    client: Optional[httpx.AsyncClient],
+    rate_limiter: Optional[RateLimiter],
+    concurrency_limiter: Optional[AdaptiveLimiter],
+    endpoint: Optional[str],
+    decoder: Optional[Callable[[bytes], Any]],
+    headers: Optional[Dict[str, str]],
+    response_handler: Optional[Callable[[httpx.Response], Any]],
+    stream: bool,
+    scheduler: Optional[PriorityScheduler],
+) -> Any:
+    # with stream=True the breaker and the limiter see the request done once
+    # the headers are in, the body is read by the caller afterwards
+    send = partial(
+        _attempt,
+        url,
+        method,
+        token,
+        data,
+        client,
+        rate_limiter,
+        decoder,
+        headers,
+        response_handler,
+        stream,
+    )
+    if scheduler is None:
+        return await _limited(send, endpoint, rate_limiter, concurrency_limiter)
+    # the lane slot comes first, so only requests the scheduler let through
+    # compete for the rate budget; a retry queues in its lane again
+    with phase("queue"):
+        lane = await scheduler.acquire()
+    try:
+        return await _limited(send, endpoint, rate_limiter, concurrency_limiter)
+    finally:
+        scheduler.release(lane)
+
+
+async def _limited(
+    send: Callable[[], Awaitable[Any]],
+    endpoint: Optional[str],
+    rate_limiter: Optional[RateLimiter],
+    concurrency_limiter: Optional[AdaptiveLimiter],
 ) -> Any:
+    if rate_limiter is not None:
+        with phase("queue"):
+            await rate_limiter.acquire(endpoint)
+    if concurrency_limiter is None:
+        return await send()
+    with phase("queue"):
+        started = await concurrency_limiter.acquire()
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method, url, headers=get_headers(token), json=data
+        result = await send()
+    except BaseException as e:
+        concurrency_limiter.release(started, e, endpoint)
+        raise
+    concurrency_limiter.release(started, endpoint=endpoint)
+    return result
+
+
+async def _attempt(
+    url: str,
+    method: str,
+    token,
+    data: Optional[Dict[str, Any]],
+    client: Optional[httpx.AsyncClient],
+    rate_limiter: Optional[RateLimiter],
+    decoder: Optional[Callable[[bytes], Any]],
+    headers: Optional[Dict[str, str]],
+    response_handler: Optional[Callable[[httpx.Response], Any]],
+    stream: bool,
+) -> Any:
+    if stream and client is None:
+        # a one-off client would be closed before the body is read
+        raise ValueError("streaming requests need a shared client")
+    try:
+        if client is not None:
+            return await _send(
+                client,
+                url,
+                method,
+                token,
+                data,
+                decoder,
+                headers,
+                response_handler,
+                stream,
+            )
+        async with httpx.AsyncClient() as one_off_client:
+            return await _send(
+                one_off_client,
+                url,
+                method,
+                token,
+                data,
+                decoder,
+                headers,
+                response_handler,
             )
-            logger.info(response.status_code)
-            response.raise_for_status()
-            return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(
             f"HTTP error occurred: {e.response.status_code} - {e.response.text}"
         )
+        if (
+            rate_limiter is not None
+            and e.response.status_code in RETRYABLE_STATUS_CODES
+        ):
+            retry_after = get_retry_after(e)
+            if retry_after is not None:
+                rate_limiter.pause(retry_after)
         raise
     except httpx.RequestError as e:
         logger.error(f"error occurred while requesting {e.request.url}")
         raise
-    except json.JSONDecodeError:
-        logger.error(f"failed to decode JSON from response")
+    except (json.JSONDecodeError, ValidationError):
+        logger.error("failed to decode response")
         raise
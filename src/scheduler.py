@@ -0,0 +1,190 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_priority: ContextVar[Optional[str]] = ContextVar("dx_heroes_priority", default=None)
+
+
+@contextmanager
+def request_priority(lane: Optional[str]) -> Iterator[None]:
+    # tags every request made inside with a scheduler lane, None goes back to
+    # the scheduler's default lane
+    token = _priority.set(lane)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Optional[str]:
+    return _priority.get()
+
+
+def in_lane(
+    func: Callable[[T], Awaitable[R]], lane: Optional[str]
+) -> Callable[[T], Awaitable[R]]:
+    # every call of func runs in lane, None keeps the caller's lane
+    if lane is None:
+        return func
+
+    async def call(item: T) -> R:
+        with request_priority(lane):
+            return await func(item)
+
+    return call
+
+
+class Lane(NamedTuple):
+    weight: float = 1.0
+    # requests of this lane in flight at once, None only bounds it by the
+    # scheduler's concurrency
+    max_concurrency: Optional[int] = None
+
+
+DEFAULT_LANES: Mapping[str, Lane] = {
+    INTERACTIVE: Lane(weight=4.0),
+    BULK: Lane(weight=1.0),
+}
+
+
+class _LaneState:
+    def __init__(self, lane: Lane) -> None:
+        self.weight = lane.weight
+        self.max_concurrency = lane.max_concurrency
+        self.waiters: deque = deque()
+        self.in_flight = 0
+        self.dispatched = 0
+        # virtual time of the next dispatch, advances by 1 / weight per request
+        self.finish = 0.0
+
+    def has_room(self) -> bool:
+        return self.max_concurrency is None or self.in_flight < self.max_concurrency
+
+
+class PriorityScheduler:
+    # hands out up to `concurrency` request slots across priority lanes with
+    # weighted fair queueing: with waiters in several lanes, each gets slots
+    # in proportion to its weight, and a lane never holds more than its
+    # max_concurrency. A lane waking up from idle starts at the current
+    # virtual time, so it cannot save up credit while nobody competes.
+    # bulk_lane is where ProductClient's bulk helpers and queue workers run,
+    # "bulk" if there is such a lane, otherwise they are not tagged
+
+    def __init__(
+        self,
+        concurrency: int = 50,
+        lanes: Optional[Mapping[str, Lane]] = None,
+        default_lane: str = INTERACTIVE,
+        bulk_lane: Optional[str] = None,
+    ) -> None:
+        lanes = DEFAULT_LANES if lanes is None else lanes
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if default_lane not in lanes:
+            raise ValueError(f"default_lane {default_lane!r} is not a lane")
+        if bulk_lane is not None and bulk_lane not in lanes:
+            raise ValueError(f"bulk_lane {bulk_lane!r} is not a lane")
+        for name, lane in lanes.items():
+            if lane.weight <= 0:
+                raise ValueError(f"weight of lane {name!r} must be positive")
+            if lane.max_concurrency is not None and lane.max_concurrency < 1:
+                raise ValueError(f"max_concurrency of lane {name!r} must be at least 1")
+        self.concurrency = concurrency
+        self.default_lane = default_lane
+        if bulk_lane is None and BULK in lanes:
+            bulk_lane = BULK
+        self.bulk_lane = bulk_lane
+        self._lanes: Dict[str, _LaneState] = {
+            name: _LaneState(lane) for name, lane in lanes.items()
+        }
+        self._in_flight = 0
+        self._virtual_time = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {
+                "in_flight": state.in_flight,
+                "waiting": len(state.waiters),
+                "dispatched": state.dispatched,
+            }
+            for name, state in self._lanes.items()
+        }
+
+    async def acquire(self, lane: Optional[str] = None) -> str:
+        # lane defaults to the one set by request_priority(); returns the lane
+        # the slot was taken from, to hand back to release()
+        name = lane or current_priority() or self.default_lane
+        state = self._lanes.get(name)
+        if state is None:
+            raise ValueError(f"unknown priority lane {name!r}")
+        if not state.waiters:
+            state.finish = max(state.finish, self._virtual_time)
+            if self._in_flight < self.concurrency and state.has_room():
+                # waiters of a lane at its cap do not stand in the way
+                if not any(
+                    other.waiters and other.has_room() for other in self._lanes.values()
+                ):
+                    self._start(state)
+                    return name
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just before the cancellation
+                self.release(name)
+            elif waiter in state.waiters:
+                state.waiters.remove(waiter)
+            raise
+        return name
+
+    def release(self, lane: str) -> None:
+        self._lanes[lane].in_flight -= 1
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _start(self, state: _LaneState) -> None:
+        self._virtual_time = state.finish
+        state.finish += 1.0 / state.weight
+        state.in_flight += 1
+        state.dispatched += 1
+        self._in_flight += 1
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.concurrency:
+            ready = [
+                state
+                for state in self._lanes.values()
+                if state.waiters and state.has_room()
+            ]
+            if not ready:
+                return
+            state = min(ready, key=lambda state: state.finish)
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            self._start(state)
+            waiter.set_result(None)
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from time import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from uuid import UUID
+
+from loguru import logger
+
+from .frame import OfferLike
+from .models import Offer, decode_offers
+
+Snapshot = Tuple[float, List[Offer]]
+
+
+def _dump_offers(offers: Sequence[OfferLike]) -> str:
+    return json.dumps(
+        [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in offers
+        ]
+    )
+
+
+class OfferSnapshotStore:
+    # SQLite history of fetched offer lists; record() only buffers in memory,
+    # a background task writes the buffer in batches so the request path never
+    # waits on disk, reads go through a worker thread
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = Path(os.path.expanduser(path))
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: List[Tuple[str, float, str]] = []
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS offer_snapshots ("
+                "product_id TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "offers TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS offer_snapshots_product_time "
+                "ON offer_snapshots (product_id, fetched_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        product_id: UUID,
+        offers: Sequence[OfferLike],
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        self._pending.append(
+            (
+                str(product_id),
+                fetched_at if fetched_at is not None else time(),
+                _dump_offers(offers),
+            )
+        )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_requested = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+        if len(self._pending) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"error writing offer snapshots: {e}")
+
+    async def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if batch:
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except sqlite3.Error:
+                # the transaction rolled back, keep the batch ahead of anything
+                # recorded meanwhile so the next flush retries it
+                self._pending[:0] = batch
+                raise
+
+    def _write(self, batch: List[Tuple[str, float, str]]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO offer_snapshots (product_id, fetched_at, offers) "
+                "VALUES (?, ?, ?)",
+                batch,
+            )
+
+    async def latest(self, product_id: UUID) -> Optional[Snapshot]:
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT product_id, fetched_at, offers FROM offer_snapshots "
+            "WHERE product_id = ? ORDER BY fetched_at DESC LIMIT 1",
+            (str(product_id),),
+        )
+        return (rows[0][1], decode_offers(rows[0][2])) if rows else None
+
+    async def latest_all(self, max_age: Optional[float] = None) -> Dict[UUID, Snapshot]:
+        since = time() - max_age if max_age is not None else 0.0
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT product_id, MAX(fetched_at), offers FROM offer_snapshots "
+            "WHERE fetched_at >= ? GROUP BY product_id",
+            (since,),
+        )
+        return {
+            UUID(product_id): (fetched_at, decode_offers(offers))
+            for product_id, fetched_at, offers in rows
+        }
+
+    async def history(
+        self,
+        product_id: UUID,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[Snapshot]:
+        rows = await asyncio.to_thread(
+            self._query,
+            "SELECT product_id, fetched_at, offers FROM offer_snapshots "
+            "WHERE product_id = ? AND fetched_at >= ? AND fetched_at <= ? "
+            "ORDER BY fetched_at",
+            (
+                str(product_id),
+                since if since is not None else float("-inf"),
+                until if until is not None else float("inf"),
+            ),
+        )
+        return [(fetched_at, decode_offers(offers)) for _, fetched_at, offers in rows]
+
+    def _query(self, sql: str, parameters: tuple) -> List[Tuple[str, float, str]]:
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, parameters).fetchall()
+
+    async def aclose(self) -> None:
+        task, self._flush_task = self._flush_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
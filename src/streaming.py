@@ -0,0 +1,64 @@
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_parse = json.JSONDecoder().raw_decode
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    # yields the items of a top-level JSON array while the body is still
+    # arriving; only the unparsed tail of the body is kept in memory
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    source = aiter(chunks)
+    buffer = ""
+    pos = 0
+    eof = False
+    need_more = False
+    expect = "["
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if need_more or pos == len(buffer):
+            if eof:
+                raise json.JSONDecodeError("unterminated array", buffer, pos)
+            chunk = await anext(source, None)
+            eof = chunk is None
+            buffer = buffer[pos:] + decode(chunk or b"", final=eof)
+            pos = 0
+            need_more = False
+            continue
+
+        char = buffer[pos]
+        if expect == "[":
+            if char != "[":
+                raise json.JSONDecodeError("expected an array", buffer, pos)
+            pos += 1
+            expect = "first"
+        elif expect == ",":
+            if char == "]":
+                return
+            if char != ",":
+                raise json.JSONDecodeError("expected ',' or ']'", buffer, pos)
+            pos += 1
+            expect = "item"
+        elif expect == "first" and char == "]":
+            return
+        else:
+            try:
+                item, end = _parse(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                need_more = True
+                continue
+            # numbers and literals have no closing delimiter, "12" or "1." may
+            # still continue in the next chunk
+            if not eof and (end == len(buffer) or buffer[end] in _NUMBER_CHARS):
+                need_more = True
+                continue
+            pos = end
+            expect = ","
+            yield item
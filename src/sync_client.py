@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Coroutine,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from uuid import UUID
+
+from .client import DEFAULT_BASE_URL, ProductClient
+from .models import Offer, Product, ProductRegistered
+
+T = TypeVar("T")
+
+
+class SyncProductClient:
+    # blocking facade for synchronous callers: one daemon thread runs an event
+    # loop that owns the async ProductClient, so connections, tokens and caches
+    # are shared by every calling thread instead of being rebuilt per call
+
+    def __init__(
+        self,
+        refresh_token,
+        base_url=DEFAULT_BASE_URL,
+        call_timeout: Optional[float] = None,
+        **client_kwargs: Any,
+    ) -> None:
+        # seconds per call; ProductClient's own httpx `timeout` goes through
+        # client_kwargs
+        self.call_timeout = call_timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="dx-heroes-sdk-loop", daemon=True
+        )
+        self._thread.start()
+        self._closed = False
+        self._close_lock = threading.Lock()
+        try:
+            self.client: ProductClient = self._run(
+                self._open(refresh_token, base_url, client_kwargs)
+            )
+        except BaseException:
+            self._stop_loop()
+            raise
+
+    async def _open(self, refresh_token, base_url, client_kwargs) -> ProductClient:
+        # built inside the loop so every asyncio primitive binds to it
+        return await ProductClient(
+            refresh_token, base_url, **client_kwargs
+        ).__aenter__()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        if self._closed:
+            coro.close()
+            raise RuntimeError("SyncProductClient is closed")
+        # the timeout runs inside the loop: wait_for cancels the call and waits
+        # for it to unwind before raising, nothing keeps running behind the
+        # caller's back and an iterator is never closed mid-step
+        future = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(coro, self.call_timeout), self._loop
+        )
+        return future.result()
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        try:
+            while True:
+                try:
+                    yield self._run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            if not self._closed:
+                self._run(iterator.aclose())
+
+    def register_product(self, product: Product) -> ProductRegistered:
+        return self._run(self.client.register_product(product))
+
+    def get_product_offers(self, product_id: UUID) -> List[Offer]:
+        return self._run(self.client.get_product_offers(product_id))
+
+    def iter_product_offers(self, product_id: UUID) -> Iterator[Offer]:
+        return self._iterate(self.client.iter_product_offers(product_id))
+
+    def register_products(
+        self,
+        products: Iterable[Product],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+    ) -> Iterator[Tuple[Product, Union[ProductRegistered, Exception]]]:
+        return self._iterate(
+            self.client.register_products(products, concurrency, ordered)
+        )
+
+    def get_offers_for_many(
+        self,
+        product_ids: Iterable[UUID],
+        concurrency: Optional[int] = None,
+        ordered: bool = False,
+    ) -> Iterator[Tuple[UUID, Union[List[Offer], Exception]]]:
+        return self._iterate(
+            self.client.get_offers_for_many(product_ids, concurrency, ordered)
+        )
+
+    def close(self) -> None:
+        with self._close_lock:
+            if self._closed:
+                return
+            try:
+                self._run(self.client.aclose())
+            finally:
+                self._closed = True
+                self._stop_loop()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> "SyncProductClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from time import time
+from typing import Optional, Union
+
+from loguru import logger
+
+
+class TokenStore(ABC):
+    # stores are called from worker threads; try_lock/unlock guard the token
+    # refresh across processes so only one of them calls /auth at a time
+
+    @abstractmethod
+    def load(self) -> Optional[str]: ...
+
+    @abstractmethod
+    def save(self, token: str) -> None: ...
+
+    @abstractmethod
+    def try_lock(self) -> bool: ...
+
+    @abstractmethod
+    def unlock(self) -> None: ...
+
+
+class FileTokenStore(TokenStore):
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = Path(os.path.expanduser(path))
+        self.lock_path = self.path.with_name(f"{self.path.name}.lock")
+        self._lock_fd: Optional[int] = None
+
+    def load(self) -> Optional[str]:
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text())
+            return data.get("access_token")
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"error loading token from file: {e}")
+            return None
+
+    def save(self, token: str) -> None:
+        # write to a temp file in the same directory and rename it over the
+        # target, so concurrent writers never leave a half-written file
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}."
+            )
+            with os.fdopen(fd, "w") as tmp_file:
+                tmp_file.write(json.dumps({"access_token": token}))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"error saving token to file: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def try_lock(self) -> bool:
+        import fcntl
+
+        if self._lock_fd is not None:
+            return False
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def unlock(self) -> None:
+        import fcntl
+
+        fd, self._lock_fd = self._lock_fd, None
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+class SQLiteTokenStore(TokenStore):
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        key: str = "default",
+        lock_ttl: float = 30.0,
+    ) -> None:
+        self.path = Path(os.path.expanduser(path))
+        self.key = key
+        # the lock is a lease, a crashed holder releases it after lock_ttl
+        self.lock_ttl = lock_ttl
+        self._owner = f"{os.getpid()}-{id(self)}"
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "key TEXT PRIMARY KEY, access_token TEXT, "
+                "lock_owner TEXT, lock_expires REAL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO tokens (key) VALUES (?)", (key,))
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30.0)
+
+    def load(self) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT access_token FROM tokens WHERE key = ?", (self.key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, token: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE tokens SET access_token = ? WHERE key = ?", (token, self.key)
+            )
+
+    def try_lock(self) -> bool:
+        now = time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE tokens SET lock_owner = ?, lock_expires = ? "
+                "WHERE key = ? AND (lock_owner IS NULL OR lock_expires < ?)",
+                (self._owner, now + self.lock_ttl, self.key, now),
+            )
+            return cursor.rowcount == 1
+
+    def unlock(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE tokens SET lock_owner = NULL, lock_expires = NULL "
+                "WHERE key = ? AND lock_owner = ?",
+                (self.key, self._owner),
+            )
@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+from time import monotonic
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID
+
+from loguru import logger
+
+from .frame import OfferLike
+
+ADDED = "added"
+REMOVED = "removed"
+PRICE_CHANGED = "price_changed"
+STOCK_CHANGED = "stock_changed"
+
+
+class OfferChange(NamedTuple):
+    kind: str
+    product_id: UUID
+    offer_id: UUID
+    old: Optional[OfferLike]
+    new: Optional[OfferLike]
+
+
+def diff_offers(
+    product_id: UUID,
+    old: Dict[UUID, OfferLike],
+    new: Dict[UUID, OfferLike],
+) -> List[OfferChange]:
+    changes = []
+    for offer_id, offer in new.items():
+        previous = old.get(offer_id)
+        if previous is None:
+            changes.append(OfferChange(ADDED, product_id, offer_id, None, offer))
+            continue
+        if previous.price != offer.price:
+            changes.append(
+                OfferChange(PRICE_CHANGED, product_id, offer_id, previous, offer)
+            )
+        if previous.items_in_stock != offer.items_in_stock:
+            changes.append(
+                OfferChange(STOCK_CHANGED, product_id, offer_id, previous, offer)
+            )
+    for offer_id, offer in old.items():
+        if offer_id not in new:
+            changes.append(OfferChange(REMOVED, product_id, offer_id, offer, None))
+    return changes
+
+
+class _Watched:
+    __slots__ = ("interval", "snapshot")
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.snapshot: Optional[Dict[UUID, OfferLike]] = None
+
+
+async def watch_offers(
+    fetch: Callable[[UUID], Awaitable[Sequence[OfferLike]]],
+    product_ids: Iterable[UUID],
+    interval: float = 30.0,
+    min_interval: float = 5.0,
+    max_interval: float = 300.0,
+    concurrency: int = 10,
+    speedup: float = 2.0,
+    backoff: float = 1.5,
+    emit_initial: bool = False,
+) -> AsyncIterator[OfferChange]:
+    # each product is re-polled after its own interval, which is divided by
+    # `speedup` when a poll finds changes and multiplied by `backoff` when it
+    # finds none or fails, always kept within [min_interval, max_interval]
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if not 0 < min_interval <= interval <= max_interval:
+        raise ValueError("intervals must satisfy 0 < min <= interval <= max")
+
+    watched = {product_id: _Watched(interval) for product_id in product_ids}
+    schedule: List[Tuple[float, UUID]] = [(0.0, product_id) for product_id in watched]
+    heapq.heapify(schedule)
+    in_flight: Dict[asyncio.Task, UUID] = {}
+    try:
+        while schedule or in_flight:
+            now = monotonic()
+            while schedule and schedule[0][0] <= now and len(in_flight) < concurrency:
+                _, product_id = heapq.heappop(schedule)
+                in_flight[asyncio.create_task(fetch(product_id))] = product_id
+
+            timeout = None
+            if schedule and len(in_flight) < concurrency:
+                timeout = max(schedule[0][0] - now, 0.0)
+            if not in_flight:
+                await asyncio.sleep(timeout)
+                continue
+            done, _ = await asyncio.wait(
+                in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                product_id = in_flight.pop(task)
+                state = watched[product_id]
+                try:
+                    offers = task.result()
+                except Exception as e:
+                    logger.warning(f"polling offers of {product_id} failed: {e}")
+                    state.interval = min(state.interval * backoff, max_interval)
+                else:
+                    snapshot = {offer.id: offer for offer in offers}
+                    if state.snapshot is None and not emit_initial:
+                        changes = []
+                    else:
+                        changes = diff_offers(
+                            product_id, state.snapshot or {}, snapshot
+                        )
+                    state.snapshot = snapshot
+                    if changes:
+                        state.interval = max(state.interval / speedup, min_interval)
+                    else:
+                        state.interval = min(state.interval * backoff, max_interval)
+                    for change in changes:
+                        yield change
+                heapq.heappush(schedule, (monotonic() + state.interval, product_id))
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -13,8 +14,12 @@ from src.auth import TokenManager
 
 
 @pytest.fixture
-def token_manager():
-    return TokenManager("test_refresh_token", "https://test.api.com")
+def token_manager(tmp_path):
+    return TokenManager(
+        "test_refresh_token",
+        "https://test.api.com",
+        token_file=tmp_path / ".dx_heroes_token.json",
+    )
 
 
 @pytest.fixture
@@ -30,12 +35,36 @@ def expired_jwt_token():
 
 
 class TestTokenManager:
-    def test_init(self, token_manager):
+    def test_init(self):
+        token_manager = TokenManager("test_refresh_token", "https://test.api.com")
         assert token_manager.refresh_token == "test_refresh_token"
         assert token_manager.base_url == "https://test.api.com"
         assert token_manager.token_file == Path(
             os.path.expanduser("./.dx_heroes_token.json")
         )
+        assert isinstance(token_manager.client, httpx.AsyncClient)
+
+    def test_init_shared_client(self):
+        client = httpx.AsyncClient()
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", client
+        )
+        assert token_manager.client is client
+
+    @pytest.mark.asyncio
+    async def test_aclose_does_not_close_shared_client(self):
+        client = httpx.AsyncClient()
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", client
+        )
+        await token_manager.aclose()
+        assert not client.is_closed
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_owned_client(self, token_manager):
+        await token_manager.aclose()
+        assert token_manager.client.is_closed
 
     def test_load_access_token_from_file_success(self, token_manager):
         with (
@@ -63,16 +92,73 @@ class TestTokenManager:
             token = token_manager.load_access_token_from_file()
             assert token is None
 
-    def test_save_access_token_to_file_success(self, token_manager):
-        with patch("pathlib.Path.write_text") as mock_write:
-            token_manager.save_access_token_to_file("test_token")
-            mock_write.assert_called_once_with('{"access_token": "test_token"}')
+    def test_save_access_token_to_file_success(self, tmp_path):
+        token_file = tmp_path / "token.json"
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=token_file
+        )
+        token_manager.save_access_token_to_file("test_token")
+        assert token_file.read_text() == '{"access_token": "test_token"}'
+        assert list(tmp_path.iterdir()) == [token_file]
 
-    def test_save_access_token_to_file_os_error(self, token_manager):
-        with patch("pathlib.Path.write_text") as mock_write:
-            mock_write.side_effect = OSError("Permission denied")
+    def test_save_access_token_to_file_os_error(self, tmp_path):
+        token_file = tmp_path / "token.json"
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=token_file
+        )
+        with patch("src.auth.os.replace") as mock_replace:
+            mock_replace.side_effect = OSError("Permission denied")
             with pytest.raises(OSError):
                 token_manager.save_access_token_to_file("test_token")
+        assert list(tmp_path.iterdir()) == []
+
+    def test_save_access_token_to_file_replaces_existing(self, tmp_path):
+        token_file = tmp_path / "token.json"
+        token_file.write_text('{"access_token": "old_token"}')
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=token_file
+        )
+        token_manager.save_access_token_to_file("new_token")
+        assert token_manager.load_access_token_from_file() == "new_token"
+
+    def test_token_file_disabled(self):
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=None
+        )
+        assert token_manager.token_file is None
+        assert token_manager.load_access_token_from_file() is None
+
+    def test_access_token_expiry_cached(self, token_manager, valid_jwt_token):
+        with patch("jwt.decode", wraps=jwt.decode) as mock_decode:
+            token_manager.access_token = valid_jwt_token
+            for _ in range(3):
+                assert not token_manager.is_token_expired(valid_jwt_token)
+            mock_decode.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_access_token_loads_saved_token(self, tmp_path, valid_jwt_token):
+        token_file = tmp_path / "token.json"
+        token_file.write_text(json.dumps({"access_token": valid_jwt_token}))
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=token_file
+        )
+        assert token_manager.access_token is None
+        with patch.object(token_manager, "authenticate") as mock_auth:
+            assert await token_manager.get_access_token() == valid_jwt_token
+            mock_auth.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_authenticate_persists_token(self, tmp_path):
+        token_file = tmp_path / "token.json"
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_file=token_file
+        )
+        with patch("src.auth.perform_request") as mock_perform_request:
+            mock_perform_request.return_value = {"access_token": "new_access_token"}
+            await token_manager.authenticate()
+        assert json.loads(token_file.read_text()) == {
+            "access_token": "new_access_token"
+        }
 
     def test_is_token_expired_valid_token(self, token_manager, valid_jwt_token):
         assert not token_manager.is_token_expired(valid_jwt_token)
@@ -87,7 +173,20 @@ class TestTokenManager:
             with patch.object(token_manager, "save_access_token_to_file") as mock_save:
                 token = await token_manager.authenticate()
                 mock_perform_request.assert_called_once_with(
-                    "https://test.api.com/auth", "POST", "test_refresh_token"
+                    "https://test.api.com/auth",
+                    "POST",
+                    "test_refresh_token",
+                    None,
+                    client=token_manager.client,
+                    rate_limiter=None,
+                    endpoint="/auth",
+                    decoder=None,
+                    circuit_breaker=None,
+                    concurrency_limiter=None,
+                    headers=None,
+                    response_handler=None,
+                    stream=False,
+                    scheduler=None,
                 )
                 mock_save.assert_called_once_with("new_access_token")
                 assert token == "new_access_token"
@@ -136,7 +235,20 @@ class TestTokenManager:
             )
 
             mock_perform_request.assert_called_once_with(
-                "https://test.api.com/endpoint", "GET", "valid_token", {"data": "test"}
+                "https://test.api.com/endpoint",
+                "GET",
+                "valid_token",
+                {"data": "test"},
+                client=token_manager.client,
+                rate_limiter=None,
+                endpoint="/endpoint",
+                decoder=None,
+                circuit_breaker=None,
+                concurrency_limiter=None,
+                headers=None,
+                response_handler=None,
+                stream=False,
+                scheduler=None,
             )
             assert result == {"result": "success"}
 
@@ -164,3 +276,124 @@ class TestTokenManager:
 
                 assert mock_perform_request.call_count == 2
                 assert result == {"result": "success"}
+
+    @pytest.mark.asyncio
+    async def test_authenticate_single_flight(self, token_manager):
+        calls = 0
+
+        async def slow_auth(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"access_token": "new_access_token"}
+
+        with (
+            patch("src.auth.perform_request", side_effect=slow_auth),
+            patch.object(token_manager, "save_access_token_to_file"),
+        ):
+            tokens = await asyncio.gather(
+                *(token_manager.authenticate() for _ in range(10))
+            )
+
+        assert calls == 1
+        assert tokens == ["new_access_token"] * 10
+
+    @pytest.mark.asyncio
+    async def test_authenticate_failure_not_cached(self, token_manager):
+        with (
+            patch("src.auth.perform_request") as mock_perform_request,
+            patch.object(token_manager, "save_access_token_to_file"),
+        ):
+            mock_perform_request.side_effect = [
+                httpx.ConnectError("boom"),
+                {"access_token": "new_access_token"},
+            ]
+            with pytest.raises(httpx.ConnectError):
+                await token_manager.authenticate()
+            assert await token_manager.authenticate() == "new_access_token"
+
+    @pytest.mark.asyncio
+    async def test_get_access_token_expired_concurrent(
+        self, token_manager, expired_jwt_token, valid_jwt_token
+    ):
+        token_manager.access_token = expired_jwt_token
+
+        async def slow_auth(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return {"access_token": valid_jwt_token}
+
+        with (
+            patch("src.auth.perform_request", side_effect=slow_auth) as mock_perform,
+            patch.object(token_manager, "save_access_token_to_file"),
+        ):
+            tokens = await asyncio.gather(
+                *(token_manager.get_access_token() for _ in range(10))
+            )
+
+        assert mock_perform.call_count == 1
+        assert set(tokens) == {valid_jwt_token}
+
+    @pytest.mark.asyncio
+    async def test_execute_authenticated_request_401_token_already_refreshed(
+        self, token_manager
+    ):
+        response_mock = MagicMock()
+        response_mock.status_code = 401
+        error_401 = httpx.HTTPStatusError(
+            "Unauthorized", request=MagicMock(), response=response_mock
+        )
+
+        async def rejected_then_refreshed(url, method, token, data=None, **kwargs):
+            if token == "old_token":
+                token_manager.access_token = "new_token"
+                raise error_401
+            return {"result": "success"}
+
+        with (
+            patch("src.auth.perform_request", side_effect=rejected_then_refreshed),
+            patch.object(token_manager, "get_access_token", return_value="old_token"),
+            patch.object(token_manager, "authenticate") as mock_authenticate,
+        ):
+            result = await token_manager.execute_authenticated_request(
+                "https://test.api.com/endpoint", "GET"
+            )
+
+        mock_authenticate.assert_not_called()
+        assert result == {"result": "success"}
+
+    def test_seconds_until_refresh(self, valid_jwt_token):
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", refresh_margin=600
+        )
+        token_manager.access_token = valid_jwt_token
+        assert 2990 <= token_manager.seconds_until_refresh() <= 3000
+        token_manager.access_token = None
+        assert token_manager.seconds_until_refresh() == 0.0
+
+    def test_start_background_refresh_requires_margin(self, token_manager):
+        with pytest.raises(ValueError):
+            token_manager.start_background_refresh()
+
+    @pytest.mark.asyncio
+    async def test_background_refresh_renews_before_expiry(self, valid_jwt_token):
+        token_manager = TokenManager(
+            "test_refresh_token",
+            "https://test.api.com",
+            refresh_margin=3600,
+            token_file=None,
+        )
+        token_manager.access_token = None
+        refreshed = asyncio.Event()
+
+        async def auth(*args, **kwargs):
+            refreshed.set()
+            return {"access_token": valid_jwt_token}
+
+        with patch("src.auth.perform_request", side_effect=auth):
+            token_manager.start_background_refresh()
+            await asyncio.wait_for(refreshed.wait(), timeout=1)
+            await asyncio.sleep(0)
+            assert token_manager.access_token == valid_jwt_token
+            await token_manager.aclose()
+
+        assert token_manager._background_refresh_task is None
@@ -0,0 +1,113 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_failure,
+)
+
+
+def status_error(status_code):
+    request = httpx.Request("GET", "https://test.api.com/endpoint")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+def call(breaker, endpoint="/endpoint", error=None):
+    with breaker.guard(endpoint):
+        if error is not None:
+            raise error
+
+
+def fail(breaker, endpoint="/endpoint", times=1):
+    for _ in range(times):
+        with pytest.raises(httpx.HTTPStatusError):
+            call(breaker, endpoint, status_error(503))
+
+
+class TestCircuitBreaker:
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+        with pytest.raises(ValueError):
+            CircuitBreaker(window=5, min_calls=10)
+
+    def test_is_failure(self):
+        assert is_failure(status_error(500))
+        assert is_failure(httpx.ConnectError("refused"))
+        assert not is_failure(status_error(401))
+        assert not is_failure(status_error(429))
+        assert not is_failure(ValueError("bad payload"))
+
+    def test_opens_on_failure_rate(self):
+        breaker = CircuitBreaker(failure_threshold=0.5, window=4, min_calls=4)
+        call(breaker)
+        call(breaker)
+        fail(breaker)
+        assert breaker.state("/endpoint") == CLOSED
+        fail(breaker)
+        assert breaker.state("/endpoint") == OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            call(breaker)
+        assert exc_info.value.endpoint == "/endpoint"
+        assert breaker.states() == {"/endpoint": OPEN}
+
+    def test_client_errors_keep_circuit_closed(self):
+        breaker = CircuitBreaker(window=2, min_calls=2)
+        for _ in range(4):
+            with pytest.raises(httpx.HTTPStatusError):
+                call(breaker, error=status_error(404))
+        assert breaker.state("/endpoint") == CLOSED
+
+    def test_endpoints_are_independent(self):
+        breaker = CircuitBreaker(window=2, min_calls=2)
+        fail(breaker, "/auth", times=2)
+        assert breaker.state("/auth") == OPEN
+        call(breaker, "/products/{id}/offers")
+        assert breaker.state("/products/{id}/offers") == CLOSED
+
+    def test_half_open_probe_success_closes(self):
+        breaker = CircuitBreaker(window=2, min_calls=2, reset_timeout=10)
+        fail(breaker, times=2)
+        with patch("src.breaker.monotonic", return_value=1e12):
+            assert breaker.state("/endpoint") == HALF_OPEN
+            with breaker.guard("/endpoint"):
+                # only one probe goes through while half-open
+                with pytest.raises(CircuitOpenError):
+                    call(breaker)
+        assert breaker.state("/endpoint") == CLOSED
+        call(breaker)
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = CircuitBreaker(window=2, min_calls=2, reset_timeout=10)
+        fail(breaker, times=2)
+        with patch("src.breaker.monotonic", return_value=1e12):
+            fail(breaker)
+            assert breaker.state("/endpoint") == OPEN
+            with pytest.raises(CircuitOpenError):
+                call(breaker)
+
+    def test_listeners_observe_state_changes(self):
+        changes = []
+        breaker = CircuitBreaker(
+            window=1,
+            min_calls=1,
+            reset_timeout=10,
+            listeners=[lambda *change: changes.append(change)],
+        )
+        breaker.add_listener(lambda *change: 1 / 0)
+        fail(breaker)
+        with patch("src.breaker.monotonic", return_value=1e12):
+            call(breaker)
+        assert changes == [
+            ("/endpoint", CLOSED, OPEN),
+            ("/endpoint", OPEN, HALF_OPEN),
+            ("/endpoint", HALF_OPEN, CLOSED),
+        ]
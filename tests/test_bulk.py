@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from src.bulk import bounded_gather, iterate
+
+
+async def double(value: int) -> int:
+    await asyncio.sleep(0.001 * (5 - value % 5))
+    return value * 2
+
+
+async def async_numbers(count: int):
+    for value in range(count):
+        yield value
+
+
+class TestIterate:
+    @pytest.mark.asyncio
+    async def test_iterate_sync_iterable(self):
+        assert [item async for item in iterate([1, 2, 3])] == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_iterate_async_iterable(self):
+        assert [item async for item in iterate(async_numbers(3))] == [0, 1, 2]
+
+
+class TestBoundedGather:
+    @pytest.mark.asyncio
+    async def test_unordered_returns_all_results(self):
+        results = [pair async for pair in bounded_gather(double, range(20), 4)]
+        assert sorted(results) == [(value, value * 2) for value in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_ordered_keeps_input_order(self):
+        results = [
+            pair
+            async for pair in bounded_gather(double, async_numbers(20), 4, ordered=True)
+        ]
+        assert results == [(value, value * 2) for value in range(20)]
+
+    @pytest.mark.parametrize("ordered", [False, True])
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, ordered):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def track(value: int) -> int:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return value
+
+        results = [pair async for pair in bounded_gather(track, range(50), 5, ordered)]
+        assert len(results) == 50
+        assert max_in_flight == 5
+
+    @pytest.mark.asyncio
+    async def test_input_pulled_lazily(self):
+        pulled = 0
+
+        def numbers():
+            nonlocal pulled
+            for value in range(1000):
+                pulled += 1
+                yield value
+
+        async for _ in bounded_gather(double, numbers(), 3):
+            break
+        assert pulled <= 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_isolated(self):
+        async def fail_on_odd(value: int) -> int:
+            if value % 2:
+                raise ValueError(value)
+            return value
+
+        results = dict(
+            [pair async for pair in bounded_gather(fail_on_odd, range(6), 2)]
+        )
+        assert [results[value] for value in (0, 2, 4)] == [0, 2, 4]
+        assert all(isinstance(results[value], ValueError) for value in (1, 3, 5))
+
+    @pytest.mark.asyncio
+    async def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            async for _ in bounded_gather(double, range(3), 0):
+                pass
@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.cache import TTLCache
+
+
+class Counter:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+class TestTTLCache:
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            TTLCache(max_size=0)
+        with pytest.raises(ValueError):
+            TTLCache(ttl=0)
+
+    @pytest.mark.asyncio
+    async def test_hit_after_miss(self):
+        cache = TTLCache(ttl=60)
+        fetch = Counter()
+        assert await cache.get_or_fetch("a", fetch) == 1
+        assert await cache.get_or_fetch("a", fetch) == 1
+        assert fetch.calls == 1
+        assert cache.stats() == {
+            "size": 1,
+            "hits": 1,
+            "stale_hits": 0,
+            "misses": 1,
+            "evictions": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_refetched(self):
+        cache = TTLCache(ttl=10)
+        fetch = Counter()
+        with patch("src.cache.monotonic", return_value=100.0):
+            await cache.get_or_fetch("a", fetch)
+        with patch("src.cache.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+            assert await cache.get_or_fetch("a", fetch) == 2
+        assert cache.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(ttl=60)
+        fetch = Counter(delay=0.01)
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("a", fetch) for _ in range(10))
+        )
+        assert results == [1] * 10
+        assert fetch.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        cache = TTLCache(ttl=10, stale_while_revalidate=True)
+        fetch = Counter(delay=0.01)
+        with patch("src.cache.monotonic", return_value=100.0):
+            await cache.get_or_fetch("a", fetch)
+        with patch("src.cache.monotonic", return_value=111.0):
+            assert await cache.get_or_fetch("a", fetch) == 1
+            assert await cache.get_or_fetch("a", fetch) == 1
+            await asyncio.sleep(0.05)
+            assert cache.get("a") == 2
+        assert fetch.calls == 2
+        assert cache.stale_hits == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_is_not_cached(self):
+        cache = TTLCache(ttl=60)
+
+        async def fail():
+            raise ValueError("upstream failed")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_fetch("a", fail)
+        assert "a" not in cache
+        assert await cache.get_or_fetch("a", Counter()) == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_and_clear(self):
+        cache = TTLCache(ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.invalidate("a")
+        assert "a" not in cache
+        cache.clear()
+        assert len(cache) == 0
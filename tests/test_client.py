@@ -1,10 +1,42 @@
+import asyncio
+import json
+import sqlite3
+from time import time
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
 
+import httpx
+import jwt
 import pytest
+from pydantic import ValidationError
 
+from src.breaker import CircuitBreaker, CircuitOpenError
+from src.cache import TTLCache
 from src.client import ProductClient
-from src.models import Offer, Product, ProductRegistered
+from src.concurrency import AdaptiveLimiter
+from src.conditional import ConditionalCache
+from src.hedge import HedgePolicy
+from src.instrumentation import Instrumentation
+from src.models import (
+    Offer,
+    Product,
+    ProductRegistered,
+    decode_offers,
+    decode_offers_trusted,
+    decode_product_registered,
+)
+from src.registration_queue import RegistrationQueue
+from src.registry import RegisteredIdCache
+from src.request import DEFAULT_TIMEOUT
+from src.scheduler import BULK, INTERACTIVE, Lane, PriorityScheduler, request_priority
+from src.snapshots import OfferSnapshotStore
+
+
+def respond_with(payload):
+    async def execute_authenticated_request(url, method, data=None, decoder=None):
+        return decoder(json.dumps(payload).encode())
+
+    return execute_authenticated_request
 
 
 @pytest.fixture
@@ -24,6 +56,12 @@ def sample_product_registered():
     return ProductRegistered(id=uuid4())
 
 
+@pytest.fixture
+def valid_jwt_token():
+    expires_timestamp = int(time()) + 3600
+    return jwt.encode({"expires": expires_timestamp}, "secret" * 6, algorithm="HS256")
+
+
 @pytest.fixture
 def sample_offers():
     return [
@@ -48,6 +86,60 @@ class TestProductClient:
         assert client.base_url == custom_url
         assert client.token_manager.base_url == custom_url
 
+    def test_init_shares_http_client_with_token_manager(self):
+        client = ProductClient("test_token")
+        assert isinstance(client.http_client, httpx.AsyncClient)
+        assert client.token_manager.client is client.http_client
+
+    def test_init_pool_limits(self):
+        limits = httpx.Limits(max_connections=7, max_keepalive_connections=3)
+        with patch("src.request.httpx.AsyncClient") as mock_client_class:
+            ProductClient("test_token", limits=limits)
+            mock_client_class.assert_called_once_with(
+                limits=limits, http2=False, timeout=DEFAULT_TIMEOUT
+            )
+
+    @pytest.mark.asyncio
+    async def test_async_context_manager_closes_client(self):
+        async with ProductClient("test_token") as client:
+            assert not client.http_client.is_closed
+        assert client.http_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_aclose_does_not_close_injected_client(self):
+        http_client = httpx.AsyncClient()
+        async with ProductClient("test_token", client=http_client) as client:
+            assert client.http_client is http_client
+        assert not http_client.is_closed
+        await http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_everything_when_a_step_fails(self, tmp_path):
+        snapshot_store = OfferSnapshotStore(tmp_path / "snapshots.db")
+        registered_ids = RegisteredIdCache(path=tmp_path / "registered.json")
+        client = ProductClient(
+            "test_token",
+            token_file=None,
+            refresh_margin=60,
+            snapshot_store=snapshot_store,
+            registered_ids=registered_ids,
+        )
+        with patch.object(
+            client.token_manager, "_background_refresh", asyncio.Event().wait
+        ):
+            await client.__aenter__()
+        refresh_task = client.token_manager._background_refresh_task
+        with (
+            patch.object(
+                snapshot_store, "flush", side_effect=sqlite3.OperationalError("locked")
+            ),
+            patch.object(registered_ids, "save", side_effect=OSError("disk full")),
+        ):
+            with pytest.raises(sqlite3.OperationalError):
+                await client.aclose()
+        assert client.http_client.is_closed
+        assert refresh_task.cancelled()
+
     @pytest.mark.asyncio
     async def test_register_product_success(self, product_client, sample_product):
         expected_response = {"id": str(sample_product.id)}
@@ -55,7 +147,7 @@ class TestProductClient:
         with patch.object(
             product_client.token_manager,
             "execute_authenticated_request",
-            return_value=expected_response,
+            side_effect=respond_with(expected_response),
         ) as mock_request:
             result = await product_client.register_product(sample_product)
 
@@ -63,6 +155,7 @@ class TestProductClient:
                 f"{product_client.base_url}/products/register",
                 "POST",
                 sample_product.model_dump(mode="json"),
+                decoder=decode_product_registered,
             )
             assert isinstance(result, ProductRegistered)
             assert result.id == UUID(expected_response.get("id"))
@@ -82,12 +175,14 @@ class TestProductClient:
         with patch.object(
             product_client.token_manager,
             "execute_authenticated_request",
-            return_value=offers_data,
+            side_effect=respond_with(offers_data),
         ) as mock_request:
             result = await product_client.get_product_offers(product_id)
 
             mock_request.assert_called_once_with(
-                f"{product_client.base_url}/products/{product_id}/offers", "GET"
+                f"{product_client.base_url}/products/{product_id}/offers",
+                "GET",
+                decoder=decode_offers,
             )
             assert len(result) == 2
             assert all(isinstance(offer, Offer) for offer in result)
@@ -120,3 +215,663 @@ class TestProductClient:
         ):
             with pytest.raises(Exception, match="Authentication failed"):
                 await product_client.get_product_offers(product_id)
+
+    @pytest.mark.asyncio
+    async def test_register_products_streams_results(self, product_client):
+        products = [
+            Product(id=uuid4(), name=f"Product {index}", description="bulk")
+            for index in range(5)
+        ]
+        error = Exception("Registration failed")
+
+        async def register(product):
+            if product is products[2]:
+                raise error
+            return ProductRegistered(id=product.id)
+
+        with patch.object(product_client, "register_product", side_effect=register):
+            results = [
+                pair
+                async for pair in product_client.register_products(
+                    iter(products), concurrency=2, ordered=True
+                )
+            ]
+
+        assert [product for product, _ in results] == products
+        assert results[2][1] is error
+        assert all(
+            result.id == product.id
+            for product, result in results
+            if product is not products[2]
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_offers_for_many_isolates_errors(
+        self, product_client, sample_offers
+    ):
+        product_ids = [uuid4() for _ in range(4)]
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+
+        async def fetch(url, method, data=None, decoder=None):
+            if str(product_ids[1]) in url:
+                raise Exception("Upstream failed")
+            return decoder(json.dumps(offers_data).encode())
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=fetch,
+        ) as mock_request:
+            results = dict(
+                [
+                    pair
+                    async for pair in product_client.get_offers_for_many(
+                        product_ids, concurrency=3
+                    )
+                ]
+            )
+
+        assert mock_request.call_count == 4
+        assert set(results) == set(product_ids)
+        assert isinstance(results[product_ids[1]], Exception)
+        for product_id in (product_ids[0], product_ids[2], product_ids[3]):
+            assert [offer.id for offer in results[product_id]] == [
+                offer.id for offer in sample_offers
+            ]
+
+    @pytest.mark.asyncio
+    async def test_get_product_offers_cached(self, sample_offers):
+        product_client = ProductClient("test_refresh_token", offers_cache=TTLCache())
+        product_id = uuid4()
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond_with(offers_data),
+        ) as mock_request:
+            first = await product_client.get_product_offers(product_id)
+            first.clear()
+            second = await product_client.get_product_offers(product_id)
+
+        mock_request.assert_called_once()
+        assert [offer.id for offer in second] == [offer.id for offer in sample_offers]
+        assert product_client.offers_cache.hits == 1
+        await product_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_instrumentation_events(self, sample_offers, valid_jwt_token):
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+        responses = [
+            httpx.Response(201, json={"access_token": "rejected_token"}),
+            httpx.Response(401),
+            httpx.Response(201, json={"access_token": valid_jwt_token}),
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=offers_data),
+        ]
+        events = []
+        transport = httpx.MockTransport(lambda request: responses.pop(0))
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=transport),
+            token_file=None,
+            instrumentation=Instrumentation(
+                [lambda event, fields: events.append((event, fields))]
+            ),
+        )
+
+        offers = await product_client.get_product_offers(uuid4())
+
+        assert len(offers) == 2
+        assert [event for event, _ in events] == [
+            "token_refresh",
+            "reauth",
+            "token_refresh",
+            "retry",
+            "call",
+        ]
+        call = events[-1][1]
+        assert call["name"] == "get_product_offers"
+        assert call["retries"] == 1
+        assert {"token", "parse"} <= set(call["phases"])
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_trusted_responses_skip_validation(self, sample_offers):
+        product_client = ProductClient("test_refresh_token", trusted_responses=True)
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond_with(offers_data),
+        ) as mock_request:
+            result = await product_client.get_product_offers(uuid4())
+
+        assert mock_request.call_args.kwargs["decoder"] is decode_offers_trusted
+        assert [offer.id for offer in result] == [offer.id for offer in sample_offers]
+
+    @pytest.mark.asyncio
+    async def test_watch_offers_polls_past_the_offers_cache(self):
+        offers_cache = TTLCache(ttl=60)
+        product_client = ProductClient("test_refresh_token", offers_cache=offers_cache)
+        product_id = uuid4()
+        offer_id = uuid4()
+        prices = iter([100, 90, 80])
+
+        async def respond(url, method, decoder):
+            return decoder(
+                json.dumps(
+                    [{"id": str(offer_id), "price": next(prices), "items_in_stock": 1}]
+                ).encode()
+            )
+
+        # cached before the watch starts, polls must not be served from it
+        offers_cache.set(product_id, [Offer(id=offer_id, price=120, items_in_stock=1)])
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond,
+        ) as mock_request:
+            changes = product_client.watch_offers(
+                [product_id], interval=0.01, min_interval=0.01, max_interval=0.01
+            )
+            first = await asyncio.wait_for(anext(changes), timeout=1)
+            second = await asyncio.wait_for(anext(changes), timeout=1)
+            await changes.aclose()
+
+        assert mock_request.call_args.args == (
+            f"{product_client.base_url}/products/{product_id}/offers",
+            "GET",
+        )
+        assert [(change.kind, change.new.price) for change in (first, second)] == [
+            ("price_changed", 90),
+            ("price_changed", 80),
+        ]
+        assert offers_cache.get(product_id)[0].price == 80
+
+    @pytest.mark.asyncio
+    async def test_snapshot_store_records_and_warms_cache(
+        self, tmp_path, sample_offers
+    ):
+        store = OfferSnapshotStore(tmp_path / "snapshots.db")
+        product_id = uuid4()
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+
+        product_client = ProductClient("test_refresh_token", snapshot_store=store)
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond_with(offers_data),
+        ):
+            await product_client.get_product_offers(product_id)
+        await product_client.aclose()
+
+        restarted = ProductClient(
+            "test_refresh_token",
+            offers_cache=TTLCache(),
+            snapshot_store=OfferSnapshotStore(tmp_path / "snapshots.db"),
+        )
+        assert await restarted.warm_offers_cache() == 1
+        with patch.object(
+            restarted.token_manager, "execute_authenticated_request"
+        ) as mock_request:
+            offers = await restarted.get_product_offers(product_id)
+        mock_request.assert_not_called()
+        assert offers == sample_offers
+        await restarted.aclose()
+
+    @pytest.mark.asyncio
+    async def test_warm_offers_cache_requires_cache_and_store(self, product_client):
+        with pytest.raises(ValueError):
+            await product_client.warm_offers_cache()
+
+    @pytest.mark.asyncio
+    async def test_deadline_covers_whole_call(self, sample_product):
+        product_client = ProductClient("test_refresh_token", deadline=10.0)
+
+        async def slow_request(url, method, data=None, decoder=None):
+            await asyncio.sleep(1)
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=slow_request,
+        ):
+            with pytest.raises(TimeoutError):
+                await product_client.register_product(sample_product, deadline=0.01)
+            with pytest.raises(TimeoutError):
+                await product_client.get_product_offers(uuid4(), deadline=0.01)
+
+    @pytest.mark.asyncio
+    async def test_hedged_offers_take_first_response(self, sample_offers):
+        hedge = HedgePolicy(min_samples=1)
+        hedge.observe(0.01)
+        product_client = ProductClient("test_refresh_token", hedge=hedge)
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+        delays = iter([1.0, 0.0])
+
+        async def fetch(url, method, data=None, decoder=None):
+            await asyncio.sleep(next(delays))
+            return decoder(json.dumps(offers_data).encode())
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=fetch,
+        ) as mock_request:
+            offers = await product_client.get_product_offers(uuid4())
+
+        assert mock_request.call_count == 2
+        assert offers == sample_offers
+        assert hedge.hedge_wins == 1
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_fails_fast_and_reports(self, valid_jwt_token):
+        events = []
+        transport = httpx.MockTransport(
+            lambda request: (
+                httpx.Response(201, json={"access_token": valid_jwt_token})
+                if request.url.path.endswith("/auth")
+                else httpx.Response(500)
+            )
+        )
+        breaker = CircuitBreaker(window=1, min_calls=1)
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=transport),
+            token_file=None,
+            circuit_breaker=breaker,
+            instrumentation=Instrumentation(
+                [lambda event, fields: events.append((event, fields))]
+            ),
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await product_client.get_product_offers(uuid4())
+        with pytest.raises(CircuitOpenError):
+            await product_client.get_product_offers(uuid4())
+
+        assert breaker.states() == {"/auth": "closed", "/products/{id}/offers": "open"}
+        circuit_events = [fields for event, fields in events if event == "circuit"]
+        assert circuit_events == [
+            {"endpoint": "/products/{id}/offers", "previous": "closed", "state": "open"}
+        ]
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_registrations_are_coalesced(
+        self, product_client, sample_product
+    ):
+        async def register(url, method, data=None, decoder=None):
+            await asyncio.sleep(0.01)
+            return ProductRegistered(id=data["id"])
+
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=register,
+        ) as mock_request:
+            results = await asyncio.gather(
+                *(product_client.register_product(sample_product) for _ in range(3))
+            )
+            await product_client.register_product(sample_product)
+
+        assert mock_request.call_count == 2
+        assert all(result.id == sample_product.id for result in results)
+        assert product_client.registration_stats() == {
+            "coalesced": 2,
+            "cached": 0,
+            "saved": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_registered_ids_short_circuit_and_persist(
+        self, tmp_path, sample_product
+    ):
+        path = tmp_path / "registered.json"
+        product_client = ProductClient(
+            "test_refresh_token", registered_ids=RegisteredIdCache(path=path)
+        )
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond_with({"id": str(sample_product.id)}),
+        ) as mock_request:
+            await product_client.register_product(sample_product)
+            cached = await product_client.register_product(sample_product)
+        await product_client.aclose()
+
+        mock_request.assert_called_once()
+        assert cached.id == sample_product.id
+        assert product_client.registration_stats()["cached"] == 1
+
+        restarted = ProductClient(
+            "test_refresh_token", registered_ids=RegisteredIdCache(path=path)
+        )
+        with patch.object(
+            restarted.token_manager, "execute_authenticated_request"
+        ) as mock_request:
+            result = await restarted.register_product(sample_product)
+        mock_request.assert_not_called()
+        assert result.id == sample_product.id
+        await restarted.aclose()
+
+    @pytest.mark.asyncio
+    async def test_enqueue_registration(self, sample_product):
+        product_client = ProductClient(
+            "test_refresh_token", registration_queue=RegistrationQueue()
+        )
+        with patch.object(
+            product_client.token_manager,
+            "execute_authenticated_request",
+            side_effect=respond_with({"id": str(sample_product.id)}),
+        ):
+            future = await product_client.enqueue_registration(sample_product)
+            result = await future
+        await product_client.aclose()
+
+        assert isinstance(result, ProductRegistered)
+        assert result.id == sample_product.id
+
+    @pytest.mark.asyncio
+    async def test_enqueue_registration_requires_queue(
+        self, product_client, sample_product
+    ):
+        with pytest.raises(ValueError):
+            await product_client.enqueue_registration(sample_product)
+
+    def test_concurrency_limiter_is_shared_and_exposed(self, product_client):
+        limiter = AdaptiveLimiter(initial_limit=5, max_limit=50)
+        adaptive_client = ProductClient(
+            "test_refresh_token", concurrency_limiter=limiter
+        )
+        assert adaptive_client.token_manager.concurrency_limiter is limiter
+        assert adaptive_client.concurrency_limit == 5
+        assert adaptive_client._concurrency(None) == 50
+        assert adaptive_client._concurrency(3) == 3
+        assert product_client.concurrency_limit is None
+        assert product_client._concurrency(None) == 10
+
+    @pytest.mark.asyncio
+    async def test_conditional_offers_reuse_parsed_list_on_304(
+        self, sample_offers, valid_jwt_token
+    ):
+        offers_data = [
+            {
+                "id": str(offer.id),
+                "price": offer.price,
+                "items_in_stock": offer.items_in_stock,
+            }
+            for offer in sample_offers
+        ]
+        requests = []
+
+        def handler(request):
+            if request.url.path.endswith("/auth"):
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, json=offers_data, headers={"etag": '"v1"'})
+
+        conditional_cache = ConditionalCache()
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            token_file=None,
+            conditional_cache=conditional_cache,
+        )
+        product_id = uuid4()
+
+        with patch.object(
+            product_client, "_decode_offers", wraps=product_client._decode_offers
+        ) as mock_decode:
+            first = await product_client.get_product_offers(product_id)
+            first.clear()
+            second = await product_client.get_product_offers(product_id)
+
+        assert mock_decode.call_count == 1
+        assert "if-none-match" not in requests[0].headers
+        assert requests[1].headers["if-none-match"] == '"v1"'
+        assert "gzip" in requests[1].headers["accept-encoding"]
+        assert second == sample_offers
+        assert conditional_cache.stats() == {
+            "size": 1,
+            "not_modified": 1,
+            "modified": 1,
+        }
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_iter_product_offers_streams_validated_offers(
+        self, sample_offers, valid_jwt_token
+    ):
+        body = json.dumps(
+            [
+                {
+                    "id": str(offer.id),
+                    "price": offer.price,
+                    "items_in_stock": offer.items_in_stock,
+                }
+                for offer in sample_offers
+            ]
+        ).encode()
+        auth_calls = []
+        offer_requests = []
+
+        async def chunks():
+            for start in range(0, len(body), 16):
+                yield body[start : start + 16]
+
+        def handler(request):
+            if request.url.path.endswith("/auth"):
+                auth_calls.append(request)
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            offer_requests.append(request)
+            if len(offer_requests) == 1:
+                return httpx.Response(401, json={"detail": "Access token invalid"})
+            return httpx.Response(200, content=chunks())
+
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            token_file=None,
+        )
+
+        offers = [offer async for offer in product_client.iter_product_offers(uuid4())]
+
+        assert offers == sample_offers
+        assert len(auth_calls) == 2
+        assert len(offer_requests) == 2
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_iter_product_offers_errors(self, valid_jwt_token):
+        invalid_id = uuid4()
+
+        def handler(request):
+            if request.url.path.endswith("/auth"):
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            if str(invalid_id) in request.url.path:
+                return httpx.Response(200, content=b'[{"id": "not-a-uuid"}]')
+            return httpx.Response(404, json={"detail": "Not found"})
+
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            token_file=None,
+        )
+
+        with pytest.raises(httpx.HTTPStatusError):
+            async for _ in product_client.iter_product_offers(uuid4()):
+                pass
+        with pytest.raises(ValidationError):
+            async for _ in product_client.iter_product_offers(invalid_id):
+                pass
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_scheduler_lanes_per_call(self, sample_product, valid_jwt_token):
+        scheduler = PriorityScheduler()
+        lanes = []
+
+        def handler(request):
+            lanes.append(
+                {
+                    lane
+                    for lane, stats in scheduler.stats().items()
+                    if stats["in_flight"]
+                }
+            )
+            if request.url.path.endswith("/auth"):
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            if request.url.path.endswith("/register"):
+                return httpx.Response(201, json={"id": str(sample_product.id)})
+            return httpx.Response(200, json=[])
+
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            token_file=None,
+            scheduler=scheduler,
+        )
+        assert product_client.token_manager.scheduler is scheduler
+
+        with request_priority(BULK):
+            await product_client.get_product_offers(uuid4())
+        await product_client.get_product_offers(uuid4(), priority=BULK)
+        async for _ in product_client.register_products([sample_product]):
+            pass
+        async for _ in product_client.get_offers_for_many(
+            [uuid4()], priority=INTERACTIVE
+        ):
+            pass
+
+        # the shared token refresh runs in the default lane
+        assert lanes == [{INTERACTIVE}, {BULK}, {BULK}, {BULK}, {INTERACTIVE}]
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_watch_offers_polls_in_bulk_lane(self, valid_jwt_token):
+        lanes = []
+
+        def handler(request):
+            if request.url.path.endswith("/auth"):
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            lanes.append(
+                {
+                    lane
+                    for lane, stats in scheduler.stats().items()
+                    if stats["in_flight"]
+                }
+            )
+            return httpx.Response(
+                200, json=[{"id": str(uuid4()), "price": 100, "items_in_stock": 1}]
+            )
+
+        scheduler = PriorityScheduler()
+        product_client = ProductClient(
+            "test_refresh_token",
+            client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            token_file=None,
+            scheduler=scheduler,
+        )
+        for priority, lane in [(None, BULK), (INTERACTIVE, INTERACTIVE)]:
+            lanes.clear()
+            changes = product_client.watch_offers(
+                [uuid4()], interval=0.01, min_interval=0.01, priority=priority
+            )
+            await asyncio.wait_for(anext(changes), timeout=1)
+            await changes.aclose()
+            assert lanes and all(in_flight == {lane} for in_flight in lanes)
+        await product_client.http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_scheduler_with_custom_lane_names(
+        self, sample_product, valid_jwt_token
+    ):
+        lanes = []
+
+        def handler(request):
+            lanes.append(
+                {
+                    lane
+                    for lane, stats in scheduler.stats().items()
+                    if stats["in_flight"]
+                }
+            )
+            if request.url.path.endswith("/auth"):
+                return httpx.Response(201, json={"access_token": valid_jwt_token})
+            return httpx.Response(201, json={"id": str(sample_product.id)})
+
+        custom_lanes = {"high": Lane(weight=4.0), "low": Lane()}
+        for scheduler, bulk_lane in [
+            (PriorityScheduler(lanes=custom_lanes, default_lane="high"), "high"),
+            (
+                PriorityScheduler(
+                    lanes=custom_lanes, default_lane="high", bulk_lane="low"
+                ),
+                "low",
+            ),
+        ]:
+            lanes.clear()
+            product_client = ProductClient(
+                "test_refresh_token",
+                client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                token_file=None,
+                scheduler=scheduler,
+            )
+            results = [
+                result
+                async for _, result in product_client.register_products(
+                    [sample_product]
+                )
+            ]
+            await product_client._register_queued(sample_product)
+
+            assert results == [ProductRegistered(id=sample_product.id)]
+            assert lanes == [{"high"}, {bulk_lane}, {bulk_lane}]
+            await product_client.http_client.aclose()
@@ -0,0 +1,138 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.concurrency import AdaptiveLimiter, is_overload
+from src.request import perform_request
+
+
+def status_error(status_code):
+    request = httpx.Request("GET", "https://test.api.com/endpoint")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+class TestAdaptiveLimiter:
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(initial_limit=5, max_limit=2)
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(decrease_factor=1)
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(latency_smoothing=0)
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(latency_warmup=-1)
+
+    def test_is_overload(self):
+        assert is_overload(status_error(429))
+        assert is_overload(status_error(503))
+        assert is_overload(httpx.ReadTimeout("timed out"))
+        assert not is_overload(status_error(404))
+        assert not is_overload(ValueError("bad payload"))
+
+    @pytest.mark.asyncio
+    async def test_healthy_responses_raise_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=3, latency_tolerance=None)
+        for _ in range(10):
+            limiter.release(await limiter.acquire())
+        assert limiter.limit == 3
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_overload_cuts_limit_once_per_burst(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        started = [await limiter.acquire() for _ in range(4)]
+        for start in started:
+            limiter.release(start, status_error(429))
+        assert limiter.limit == 4
+        assert limiter.decreases == 1
+
+        with patch("src.concurrency.monotonic", return_value=started[-1] + 100):
+            limiter.release(await limiter.acquire(), status_error(503))
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_keep_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=4)
+        limiter.release(await limiter.acquire(), status_error(404))
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_response_counts_as_overload(self):
+        limiter = AdaptiveLimiter(
+            initial_limit=4, latency_tolerance=2.0, latency_warmup=1
+        )
+        with patch("src.concurrency.monotonic", side_effect=[0.0, 1.0, 2.0, 5.0, 5.0]):
+            limiter.release(await limiter.acquire())
+            limiter.release(await limiter.acquire())
+        assert limiter.latency_baseline() == pytest.approx(1.2)
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_healthy_upstream_keeps_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=50, max_limit=50)
+
+        async def respond(latency, endpoint="/products/{id}/offers"):
+            with patch("src.concurrency.monotonic", return_value=0.0):
+                started = await limiter.acquire()
+            with patch("src.concurrency.monotonic", return_value=latency):
+                limiter.release(started, endpoint=endpoint)
+
+        # one fast response, then a steady 5-6 ms with fast auth calls mixed in
+        await respond(0.001)
+        for i in range(1000):
+            await respond(0.005 + (i % 10) / 10000)
+            if i % 100 == 0:
+                await respond(0.0005, "/auth")
+        await respond(0.001)
+        await respond(0.006)
+        assert limiter.decreases == 0
+        assert limiter.limit == 50
+        assert limiter.latency_baseline("/auth") < 0.001
+        assert 0.005 < limiter.latency_baseline("/products/{id}/offers") < 0.006
+
+        # a real slowdown of the endpoint still cuts
+        await respond(0.05)
+        assert limiter.decreases == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_respect_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        first = await limiter.acquire()
+        second = asyncio.create_task(limiter.acquire())
+        cancelled = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not second.done()
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+        limiter.release(first)
+        limiter.release(await second)
+        assert limiter.in_flight == 0
+        assert not limiter._waiters
+
+    @pytest.mark.asyncio
+    async def test_perform_request_reports_to_limiter(self):
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"result": "success"}),
+        ]
+        limiter = AdaptiveLimiter(initial_limit=4, latency_tolerance=None)
+
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: responses.pop(0))
+        ) as client:
+            result = await perform_request(
+                "https://test.api.com/endpoint",
+                "GET",
+                "test_token",
+                client=client,
+                concurrency_limiter=limiter,
+            )
+
+        assert result == {"result": "success"}
+        assert (limiter.decreases, limiter.increases) == (1, 1)
+        assert limiter.in_flight == 0
@@ -0,0 +1,46 @@
+import pytest
+
+from src.conditional import ConditionalCache
+
+
+class TestConditionalCache:
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            ConditionalCache(max_size=0)
+
+    def test_request_headers(self):
+        cache = ConditionalCache()
+        assert cache.request_headers("a") == {}
+        cache.store("a", '"v1"', "Wed, 21 Oct 2026 07:28:00 GMT", [1])
+        cache.store("b", '"v2"', None, [2])
+        assert cache.request_headers("a") == {
+            "if-none-match": '"v1"',
+            "if-modified-since": "Wed, 21 Oct 2026 07:28:00 GMT",
+        }
+        assert cache.request_headers("b") == {"if-none-match": '"v2"'}
+
+    def test_store_without_validators_drops_entry(self):
+        cache = ConditionalCache()
+        cache.store("a", '"v1"', None, [1])
+        cache.store("a", None, None, [2])
+        assert "a" not in cache
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = ConditionalCache(max_size=2)
+        cache.store("a", '"a"', None, 1)
+        cache.store("b", '"b"', None, 2)
+        assert cache.get("a") == 1
+        cache.store("c", '"c"', None, 3)
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_invalidate_and_clear(self):
+        cache = ConditionalCache()
+        cache.store("a", '"a"', None, 1)
+        cache.store("b", '"b"', None, 2)
+        cache.invalidate("a")
+        assert "a" not in cache
+        cache.clear()
+        assert len(cache) == 0
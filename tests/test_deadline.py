@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from src.deadline import call_deadline, remaining
+
+
+class TestCallDeadline:
+    @pytest.mark.asyncio
+    async def test_no_deadline(self):
+        async with call_deadline(None):
+            assert remaining() is None
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_raises_timeout_when_exceeded(self):
+        with pytest.raises(TimeoutError):
+            async with call_deadline(0.01):
+                await asyncio.sleep(1)
+        assert remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_nested_deadline_never_extends_outer(self):
+        async with call_deadline(0.5):
+            async with call_deadline(10.0):
+                assert remaining() <= 0.5
+            async with call_deadline(0.1):
+                assert remaining() <= 0.1
+            assert 0.1 < remaining() <= 0.5
@@ -0,0 +1,138 @@
+import sys
+from uuid import uuid4
+
+import pytest
+
+from src.frame import OfferRow, OffersFrame
+from src.models import Offer, TrustedOffer
+
+
+@pytest.fixture
+def product_ids():
+    return [uuid4() for _ in range(3)]
+
+
+@pytest.fixture
+def offers_by_product(product_ids):
+    return {
+        product_ids[0]: [
+            Offer(id=uuid4(), price=300, items_in_stock=0),
+            Offer(id=uuid4(), price=120, items_in_stock=4),
+            Offer(id=uuid4(), price=200, items_in_stock=1),
+        ],
+        product_ids[1]: [],
+        product_ids[2]: [
+            Offer(id=uuid4(), price=90, items_in_stock=0),
+            Offer(id=uuid4(), price=150, items_in_stock=7),
+        ],
+    }
+
+
+@pytest.fixture
+def frame(offers_by_product):
+    return OffersFrame.from_offers(offers_by_product.items())
+
+
+class TestOffersFrame:
+    def test_columns(self, frame, product_ids, offers_by_product):
+        assert len(frame) == 5
+        assert frame.product_count == 3
+        assert list(frame.offsets) == [0, 3, 3, 5]
+        assert list(frame.price) == [300, 120, 200, 90, 150]
+        assert frame.offer_id(3) == offers_by_product[product_ids[2]][0].id
+
+    def test_row(self, frame, product_ids, offers_by_product):
+        offer = offers_by_product[product_ids[2]][1]
+        assert frame.row(4) == OfferRow(product_ids[2], offer.id, 150, 7)
+        with pytest.raises(IndexError):
+            frame.row(5)
+
+    def test_offers(self, frame, product_ids, offers_by_product):
+        rows = frame.offers(product_ids[0])
+        assert [row.offer_id for row in rows] == [
+            offer.id for offer in offers_by_product[product_ids[0]]
+        ]
+        assert frame.offers(product_ids[1]) == []
+
+    def test_min_and_argmin(self, frame, product_ids):
+        assert frame.min_price() == {
+            product_ids[0]: 120,
+            product_ids[1]: None,
+            product_ids[2]: 90,
+        }
+        assert frame.argmin_price() == {
+            product_ids[0]: 1,
+            product_ids[1]: None,
+            product_ids[2]: 3,
+        }
+        assert frame.cheapest(product_ids[0]).price == 120
+        assert frame.cheapest(product_ids[1]) is None
+
+    def test_spread_and_stock(self, frame, product_ids):
+        assert frame.price_spread() == {
+            product_ids[0]: 180,
+            product_ids[1]: None,
+            product_ids[2]: 60,
+        }
+        assert frame.total_stock() == {
+            product_ids[0]: 5,
+            product_ids[1]: 0,
+            product_ids[2]: 7,
+        }
+
+    def test_top_cheapest(self, frame):
+        assert [row.price for row in frame.top_cheapest(3)] == [90, 120, 150]
+        assert [row.price for row in frame.top_cheapest(2, in_stock_only=True)] == [
+            120,
+            150,
+        ]
+
+    def test_in_stock(self, frame, product_ids, offers_by_product):
+        in_stock = frame.in_stock()
+        assert list(in_stock.price) == [120, 200, 150]
+        assert list(in_stock.offsets) == [0, 2, 2, 3]
+        assert in_stock.offer_id(2) == offers_by_product[product_ids[2]][1].id
+        assert in_stock.min_price()[product_ids[2]] == 150
+
+    def test_duplicate_product(self, frame, product_ids):
+        with pytest.raises(ValueError):
+            frame.add(product_ids[0], [])
+
+    def test_trusted_offers(self, product_ids):
+        offer_id = uuid4()
+        frame = OffersFrame.from_offers(
+            [
+                (
+                    product_ids[0],
+                    [
+                        TrustedOffer(
+                            {"id": str(offer_id), "price": 10, "items_in_stock": 1}
+                        )
+                    ],
+                )
+            ]
+        )
+        assert frame.offer_id(0) == offer_id
+
+    @pytest.mark.asyncio
+    async def test_from_stream_keeps_failures(self, product_ids, offers_by_product):
+        error = Exception("Upstream failed")
+
+        async def results():
+            yield product_ids[0], offers_by_product[product_ids[0]]
+            yield product_ids[1], error
+
+        frame = await OffersFrame.from_stream(results())
+        assert frame.product_ids == [product_ids[0]]
+        assert frame.failed == {product_ids[1]: error}
+
+    def test_smaller_than_models(self, offers_by_product):
+        offers = [
+            Offer(id=uuid4(), price=index, items_in_stock=index)
+            for index in range(1000)
+        ]
+        frame = OffersFrame.from_offers([(uuid4(), offers)])
+        models_size = sum(
+            sys.getsizeof(offer) + sys.getsizeof(offer.__dict__) for offer in offers
+        )
+        assert frame.nbytes() < models_size / 5
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from src.hedge import HedgePolicy
+
+
+def trained_policy(latency=0.01, **kwargs):
+    policy = HedgePolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.observe(latency)
+    return policy
+
+
+class TestHedgePolicy:
+    def test_invalid_percentile(self):
+        with pytest.raises(ValueError):
+            HedgePolicy(percentile=100)
+
+    def test_delay_needs_min_samples(self):
+        policy = HedgePolicy(min_samples=3, min_delay=0.0)
+        policy.observe(0.1)
+        policy.observe(0.2)
+        assert policy.delay is None
+        policy.observe(0.3)
+        assert policy.delay == 0.3
+
+    def test_delay_uses_percentile(self):
+        policy = HedgePolicy(
+            percentile=50, min_samples=1, min_delay=0.0, recompute_every=1
+        )
+        for latency in (0.4, 0.1, 0.3, 0.2):
+            policy.observe(latency)
+        assert policy.delay == 0.3
+
+    @pytest.mark.asyncio
+    async def test_fast_request_is_not_hedged(self):
+        policy = trained_policy()
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            return "ok"
+
+        assert await policy.run(attempt) == "ok"
+        assert len(calls) == 1
+        assert policy.hedged == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged_and_loser_cancelled(self):
+        policy = trained_policy()
+        cancelled = asyncio.Event()
+        delays = iter([1.0, 0.0])
+
+        async def attempt():
+            delay = next(delays)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return delay
+
+        assert await policy.run(attempt) == 0.0
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert (policy.hedged, policy.hedge_wins) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_failed_attempt_waits_for_other(self):
+        policy = trained_policy()
+        outcomes = iter([0.05, None])
+
+        async def attempt():
+            delay = next(outcomes)
+            if delay is None:
+                raise Exception("hedge failed")
+            await asyncio.sleep(delay)
+            return "first"
+
+        assert await policy.run(attempt) == "first"
+        assert policy.hedge_wins == 0
+
+    @pytest.mark.asyncio
+    async def test_raises_when_all_attempts_fail(self):
+        policy = trained_policy()
+
+        async def attempt():
+            await asyncio.sleep(0.02)
+            raise Exception("upstream failed")
+
+        with pytest.raises(Exception, match="upstream failed"):
+            await policy.run(attempt)
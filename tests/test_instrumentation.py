@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.instrumentation import (
+    CallRecord,
+    Instrumentation,
+    current_call,
+    detached,
+    phase,
+    pool_stats,
+)
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def instrumentation(events):
+    return Instrumentation([lambda event, fields: events.append((event, fields))])
+
+
+class TestInstrumentation:
+    def test_phase_without_call_is_noop(self):
+        with phase("parse"):
+            pass
+        assert current_call() is None
+
+    def test_call_emits_phases(self, instrumentation, events):
+        with instrumentation.call("get_product_offers", product_id="p1") as record:
+            assert current_call() is record
+            with phase("parse"):
+                pass
+            with phase("parse"):
+                pass
+        assert current_call() is None
+
+        event, fields = events[0]
+        assert event == "call"
+        assert fields["name"] == "get_product_offers"
+        assert fields["product_id"] == "p1"
+        assert fields["error"] is None
+        assert set(fields["phases"]) == {"parse"}
+        assert fields["duration"] >= fields["phases"]["parse"]
+
+    def test_call_reports_error(self, instrumentation, events):
+        with pytest.raises(ValueError):
+            with instrumentation.call("register_product"):
+                raise ValueError("boom")
+        assert isinstance(events[0][1]["error"], ValueError)
+
+    def test_failing_hook_is_isolated(self, events):
+        def broken_hook(event, fields):
+            raise RuntimeError("hook failed")
+
+        instrumentation = Instrumentation([broken_hook])
+        instrumentation.add_hook(lambda event, fields: events.append(event))
+        instrumentation.emit("retry")
+        assert events == ["retry"]
+
+    def test_detached_hides_current_call(self, instrumentation):
+        with instrumentation.call("get_product_offers") as record:
+            with detached():
+                assert current_call() is None
+            assert current_call() is record
+
+    @pytest.mark.asyncio
+    async def test_trace_records_connect_and_ttfb(self, instrumentation):
+        record = CallRecord(instrumentation, "get_product_offers")
+        with patch("src.instrumentation.perf_counter") as mock_clock:
+            mock_clock.side_effect = [1.0, 1.5, 2.0, 2.25]
+            await record.trace("connection.connect_tcp.started", {})
+            await record.trace("connection.connect_tcp.complete", {})
+            await record.trace("http11.send_request_headers.started", {})
+            await record.trace("http11.receive_response_headers.complete", {})
+            await record.trace("http11.receive_response_body.started", {})
+        assert record.phases == {"connect": 0.5, "ttfb": 0.25}
+
+    @pytest.mark.asyncio
+    async def test_pool_stats(self):
+        async with httpx.AsyncClient() as client:
+            assert pool_stats(client) == {"connections": 0, "idle": 0, "active": 0}
+        transport = httpx.MockTransport(lambda request: httpx.Response(200))
+        async with httpx.AsyncClient(transport=transport) as client:
+            assert pool_stats(client)["connections"] == 0
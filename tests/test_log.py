@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+import pytest
+from loguru import logger
+
+from src.log import configure_hot_path_logging, log_hot_path
+
+
+class Formatted:
+    def __init__(self):
+        self.count = 0
+
+    def __format__(self, spec):
+        self.count += 1
+        return "formatted"
+
+
+@pytest.fixture
+def messages():
+    records = []
+    handler_id = logger.add(records.append, level="INFO", format="{message}")
+    yield records
+    logger.remove(handler_id)
+    configure_hot_path_logging()
+
+
+class TestHotPathLogging:
+    def test_invalid_sample_rate(self):
+        with pytest.raises(ValueError):
+            configure_hot_path_logging(sample_rate=1.5)
+
+    def test_emits_at_configured_level(self, messages):
+        configure_hot_path_logging("INFO")
+        log_hot_path("status {}", 200)
+        assert [message.strip() for message in messages] == ["status 200"]
+
+    def test_disabled_skips_loguru_and_formatting(self, messages):
+        configure_hot_path_logging(None)
+        value = Formatted()
+        with patch("src.log.logger") as mock_logger:
+            log_hot_path("value {}", value)
+        mock_logger.opt.assert_not_called()
+        assert not messages
+        assert value.count == 0
+
+    def test_sampling(self, messages):
+        configure_hot_path_logging("INFO", sample_rate=0.5)
+        with patch("src.log.random", side_effect=[0.7, 0.2]):
+            log_hot_path("dropped")
+            log_hot_path("kept")
+        assert [message.strip() for message in messages] == ["kept"]
@@ -1,9 +1,19 @@
+import json
 from uuid import UUID, uuid4
 
 import pytest
 from pydantic import ValidationError
 
-from src.models import Offer, Product, ProductRegistered
+from src.models import (
+    Offer,
+    Product,
+    ProductRegistered,
+    TrustedOffer,
+    decode_offers,
+    decode_offers_trusted,
+    decode_product_registered,
+    decode_product_registered_trusted,
+)
 
 
 class TestProduct:
@@ -100,3 +110,34 @@ class TestOffer:
         assert dumped["id"] == str(offer_id)
         assert dumped["price"] == 100
         assert dumped["items_in_stock"] == 10
+
+
+class TestDecoders:
+    offers_data = [
+        {"id": str(uuid4()), "price": 100, "items_in_stock": 10},
+        {"id": str(uuid4()), "price": 150, "items_in_stock": 0},
+    ]
+
+    def test_decode_offers(self):
+        offers = decode_offers(json.dumps(self.offers_data).encode())
+        assert [offer.model_dump(mode="json") for offer in offers] == self.offers_data
+
+    def test_decode_offers_invalid(self):
+        with pytest.raises(ValidationError):
+            decode_offers(b'[{"id": "not-a-uuid", "price": 1, "items_in_stock": 1}]')
+        with pytest.raises(ValidationError):
+            decode_offers(b"not json")
+
+    def test_decode_offers_trusted(self):
+        offers = decode_offers_trusted(json.dumps(self.offers_data).encode())
+        assert all(isinstance(offer, TrustedOffer) for offer in offers)
+        assert all(isinstance(offer.id, UUID) for offer in offers)
+        assert [
+            offer.to_offer().model_dump(mode="json") for offer in offers
+        ] == self.offers_data
+
+    def test_decode_product_registered(self):
+        product_id = uuid4()
+        content = json.dumps({"id": str(product_id)}).encode()
+        assert decode_product_registered(content).id == product_id
+        assert decode_product_registered_trusted(content).id == product_id
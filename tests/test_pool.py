@@ -0,0 +1,191 @@
+import asyncio
+from time import time
+from unittest.mock import patch
+from uuid import uuid4
+
+import httpx
+import jwt
+import pytest
+
+from src.breaker import CircuitBreaker
+from src.cache import TTLCache
+from src.instrumentation import Instrumentation
+from src.pool import ProductClientPool
+
+
+def make_token(tenant):
+    return jwt.encode(
+        {"expires": int(time()) + 3600, "tenant": tenant}, "secret" * 6, "HS256"
+    )
+
+
+@pytest.fixture
+def api():
+    calls = {"auth": [], "offers": []}
+
+    def handler(request):
+        if request.url.path.endswith("/auth"):
+            tenant = request.headers["Bearer"].removeprefix("refresh-")
+            calls["auth"].append(tenant)
+            return httpx.Response(201, json={"access_token": make_token(tenant)})
+        claims = jwt.decode(
+            request.headers["Bearer"], options={"verify_signature": False}
+        )
+        calls["offers"].append(claims["tenant"])
+        return httpx.Response(200, json=[])
+
+    calls["transport"] = httpx.MockTransport(handler)
+    return calls
+
+
+def make_pool(api, **kwargs):
+    return ProductClientPool(
+        lambda tenant: f"refresh-{tenant}",
+        base_url="https://test.api.com",
+        client=httpx.AsyncClient(transport=api["transport"]),
+        **kwargs,
+    )
+
+
+class TestProductClientPool:
+    def test_invalid_max_tenants(self):
+        with pytest.raises(ValueError):
+            ProductClientPool({}, max_tenants=0)
+
+    @pytest.mark.asyncio
+    async def test_tenants_share_http_client_but_not_tokens(self, api):
+        pool = make_pool(api)
+        await pool.get_product_offers("a", uuid4())
+        await pool.get_product_offers("b", uuid4())
+        await pool.get_product_offers("a", uuid4())
+
+        assert api["auth"] == ["a", "b"]
+        assert api["offers"] == ["a", "b", "a"]
+        async with pool.tenant("a") as client_a, pool.tenant("b") as client_b:
+            assert client_a is not client_b
+            assert client_a.http_client is client_b.http_client is pool.http_client
+            assert client_a.token_manager.token_store is None
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_refresh_tokens_mapping(self, api):
+        pool = ProductClientPool(
+            {"a": "refresh-a"},
+            base_url="https://test.api.com",
+            client=httpx.AsyncClient(transport=api["transport"]),
+        )
+        await pool.get_product_offers("a", uuid4())
+        with pytest.raises(KeyError):
+            await pool.get_product_offers("unknown", uuid4())
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_idle_tenant(self, api):
+        pool = make_pool(api, max_tenants=2)
+        await pool.get_product_offers("a", uuid4())
+        await pool.get_product_offers("b", uuid4())
+        await pool.get_product_offers("a", uuid4())
+        await pool.get_product_offers("c", uuid4())
+
+        assert pool.tenants() == ["a", "c"]
+        assert pool.stats() == {"tenants": 2, "evictions": 1}
+        await pool.get_product_offers("b", uuid4())
+        assert api["auth"] == ["a", "b", "c", "b"]
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_tenants_in_use_are_not_evicted(self, api):
+        pool = make_pool(api, max_tenants=1)
+        async with pool.tenant("a") as client_a:
+            await pool.get_product_offers("b", uuid4())
+            assert "a" in pool
+            await client_a.get_product_offers(uuid4())
+        await pool.get_product_offers("b", uuid4())
+        assert pool.tenants() == ["b"]
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_owned_http_client(self):
+        pool = ProductClientPool({"a": "refresh-a"})
+        async with pool:
+            async with pool.tenant("a"):
+                pass
+        assert pool.http_client.is_closed
+        assert len(pool) == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_calls_share_tenant(self, api):
+        pool = make_pool(api)
+        await asyncio.gather(*(pool.get_product_offers("a", uuid4()) for _ in range(5)))
+        assert api["auth"] == ["a"]
+        assert len(pool) == 1
+        await pool.aclose()
+
+    def test_rejects_shared_tenant_state(self):
+        with pytest.raises(ValueError, match="offers_cache"):
+            ProductClientPool({}, offers_cache=TTLCache())
+
+    @pytest.mark.asyncio
+    async def test_tenant_state_is_not_shared(self):
+        def handler(request):
+            if request.url.path.endswith("/auth"):
+                tenant = request.headers["Bearer"].removeprefix("refresh-")
+                return httpx.Response(201, json={"access_token": make_token(tenant)})
+            claims = jwt.decode(
+                request.headers["Bearer"], options={"verify_signature": False}
+            )
+            price = {"a": 100, "b": 200, "c": 300}[claims["tenant"]]
+            return httpx.Response(
+                200, json=[{"id": str(uuid4()), "price": price, "items_in_stock": 1}]
+            )
+
+        caches = {}
+
+        def tenant_state(tenant):
+            caches[tenant] = TTLCache()
+            return {"offers_cache": caches[tenant]}
+
+        pool = make_pool(
+            {"transport": httpx.MockTransport(handler)},
+            max_tenants=2,
+            tenant_state=tenant_state,
+        )
+        product_id = uuid4()
+
+        offers_a = await pool.get_product_offers("a", product_id)
+        offers_b = await pool.get_product_offers("b", product_id)
+        assert offers_a[0].price == 100
+        assert offers_b[0].price == 200
+        assert caches["a"] is not caches["b"]
+
+        # evicting "a" closes only its own cache, "b" keeps serving from its one
+        with patch.object(caches["b"], "aclose") as close_b:
+            await pool.get_product_offers("c", uuid4())
+            assert "a" not in pool
+            close_b.assert_not_called()
+        assert (await pool.get_product_offers("b", product_id))[0].price == 200
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_breaker_reports_once(self, api):
+        events = []
+        breaker = CircuitBreaker(window=1, min_calls=1)
+        pool = make_pool(
+            api,
+            max_tenants=2,
+            circuit_breaker=breaker,
+            instrumentation=Instrumentation(
+                [lambda event, fields: events.append(event)]
+            ),
+        )
+        for tenant in range(50):
+            await pool.get_product_offers(tenant, uuid4())
+        assert pool.evictions == 48
+        assert len(breaker.listeners) == 1
+
+        request = httpx.Request("GET", "https://test.api.com/products")
+        with pytest.raises(httpx.ConnectError):
+            with breaker.guard("/products"):
+                raise httpx.ConnectError("down", request=request)
+        assert events.count("circuit") == 1
+        await pool.aclose()
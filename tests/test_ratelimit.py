@@ -0,0 +1,56 @@
+import asyncio
+from time import monotonic
+
+import pytest
+
+from src.ratelimit import RateLimiter, TokenBucket
+
+
+class TestTokenBucket:
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(0)
+
+    @pytest.mark.asyncio
+    async def test_burst_is_immediate(self):
+        bucket = TokenBucket(rate=1, capacity=5)
+        start = monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert monotonic() - start < 0.05
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_refill(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        assert monotonic() - start >= 0.09
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_endpoint_bucket_is_separate(self):
+        limiter = RateLimiter(rate=1000, burst=1000, endpoint_limits={"/auth": (20, 1)})
+        start = monotonic()
+        for _ in range(20):
+            await limiter.acquire("/products/register")
+        assert monotonic() - start < 0.05
+
+        start = monotonic()
+        for _ in range(3):
+            await limiter.acquire("/auth")
+        assert monotonic() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_pause_delays_all_requests(self):
+        limiter = RateLimiter(rate=1000, burst=1000)
+        limiter.pause(0.05)
+        start = monotonic()
+        await asyncio.gather(limiter.acquire(), limiter.acquire("/auth"))
+        assert monotonic() - start >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_without_limits(self):
+        limiter = RateLimiter()
+        await limiter.acquire("/auth")
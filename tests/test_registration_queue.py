@@ -0,0 +1,149 @@
+import asyncio
+import sqlite3
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from src.models import Product, ProductRegistered
+from src.registration_queue import RegistrationQueue
+
+
+def make_product(index=0):
+    return Product(id=uuid4(), name=f"Product {index}", description="queued")
+
+
+async def register(product):
+    await asyncio.sleep(0)
+    return ProductRegistered(id=product.id)
+
+
+class TestRegistrationQueue:
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            RegistrationQueue(capacity=0)
+        with pytest.raises(ValueError):
+            RegistrationQueue(concurrency=0)
+
+    @pytest.mark.asyncio
+    async def test_enqueue_requires_start(self):
+        with pytest.raises(RuntimeError):
+            await RegistrationQueue().enqueue(make_product())
+
+    @pytest.mark.asyncio
+    async def test_futures_and_callbacks_get_results(self):
+        queue = RegistrationQueue(concurrency=2)
+        await queue.start(register)
+        results = []
+
+        async def callback(product, result):
+            results.append((product, result))
+
+        products = [make_product(index) for index in range(5)]
+        futures = [await queue.enqueue(product, callback) for product in products]
+        registered = await asyncio.gather(*futures)
+        await queue.join()
+        await queue.aclose()
+
+        assert [result.id for result in registered] == [p.id for p in products]
+        assert {product.id for product, _ in results} == {p.id for p in products}
+        assert (queue.completed, queue.failed, queue.pending) == (5, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_failures_reach_future_and_callback(self):
+        error = Exception("Registration failed")
+        results = []
+
+        async def failing(product):
+            raise error
+
+        queue = RegistrationQueue()
+        await queue.start(failing)
+        future = await queue.enqueue(
+            make_product(), lambda product, result: results.append(result)
+        )
+        with pytest.raises(Exception, match="Registration failed"):
+            await future
+        await queue.join()
+        await queue.aclose()
+
+        assert results == [error]
+        assert queue.failed == 1
+
+    @pytest.mark.asyncio
+    async def test_capacity_applies_backpressure(self):
+        release = asyncio.Event()
+
+        async def blocked(product):
+            await release.wait()
+            return ProductRegistered(id=product.id)
+
+        queue = RegistrationQueue(capacity=2, concurrency=1)
+        await queue.start(blocked)
+        await queue.enqueue(make_product(1))
+        await queue.enqueue(make_product(2))
+        third = asyncio.create_task(queue.enqueue(make_product(3)))
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        assert queue.pending == 2
+
+        release.set()
+        await (await third)
+        await queue.aclose()
+
+    @pytest.mark.asyncio
+    async def test_persisted_items_survive_restart(self, tmp_path):
+        path = tmp_path / "queue.db"
+        products = [make_product(index) for index in range(3)]
+        never_registered = asyncio.Event()
+
+        async def stuck(product):
+            await never_registered.wait()
+
+        queue = RegistrationQueue(path=path)
+        await queue.start(stuck)
+        futures = [await queue.enqueue(product) for product in products]
+        await queue.aclose()
+        assert all(future.cancelled() for future in futures)
+
+        registered = []
+
+        async def record(product):
+            registered.append(product)
+            return ProductRegistered(id=product.id)
+
+        restarted = RegistrationQueue(path=path)
+        assert await restarted.start(record) == 3
+        await restarted.join()
+        await restarted.aclose()
+        assert {product.id for product in registered} == {p.id for p in products}
+
+        empty = RegistrationQueue(path=path)
+        assert await empty.start(record) == 0
+        await empty.aclose()
+
+    @pytest.mark.asyncio
+    async def test_storage_error_keeps_worker_running(self, tmp_path):
+        queue = RegistrationQueue(capacity=1, concurrency=1, path=tmp_path / "q.db")
+        await queue.start(register)
+        results = []
+        products = [make_product(index) for index in range(3)]
+
+        async def enqueue_all():
+            # with a dead worker the second enqueue would wait for a free slot
+            futures = [
+                await queue.enqueue(
+                    product, callback=lambda product, result: results.append(result)
+                )
+                for product in products
+            ]
+            return await asyncio.gather(*futures)
+
+        with patch.object(
+            queue, "_delete", side_effect=sqlite3.OperationalError("database is locked")
+        ):
+            done = await asyncio.wait_for(enqueue_all(), timeout=1)
+        assert [result.id for result in done] == [p.id for p in products]
+        assert len(results) == 3
+        assert queue.completed == 3
+        await queue.aclose()
@@ -0,0 +1,51 @@
+from uuid import uuid4
+
+import pytest
+
+from src.registry import RegisteredIdCache
+
+
+class TestRegisteredIdCache:
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            RegisteredIdCache(max_size=0)
+
+    def test_get_counts_hits_and_misses(self):
+        cache = RegisteredIdCache()
+        product_id, registered_id = uuid4(), uuid4()
+        assert cache.get(product_id) is None
+        cache.add(product_id, registered_id)
+        assert cache.get(product_id) == registered_id
+        assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+    def test_evicts_least_recently_used(self):
+        cache = RegisteredIdCache(max_size=2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+        cache.add(first, first)
+        cache.add(second, second)
+        cache.get(first)
+        cache.add(third, third)
+        assert first in cache
+        assert second not in cache
+        assert len(cache) == 2
+
+    def test_persists_across_restarts(self, tmp_path):
+        path = tmp_path / "registered.json"
+        cache = RegisteredIdCache(path=path)
+        product_id, registered_id = uuid4(), uuid4()
+        cache.add(product_id, registered_id)
+        cache.save()
+
+        restarted = RegisteredIdCache(max_size=10, path=path)
+        assert restarted.get(product_id) == registered_id
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_save_skips_unchanged_cache(self, tmp_path):
+        path = tmp_path / "registered.json"
+        RegisteredIdCache(path=path).save()
+        assert not path.exists()
+
+    def test_load_ignores_corrupt_file(self, tmp_path):
+        path = tmp_path / "registered.json"
+        path.write_text("{not json")
+        assert len(RegisteredIdCache(path=path)) == 0
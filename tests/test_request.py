@@ -3,14 +3,29 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
+from tenacity import RetryError
 
-from src.request import perform_request
+from src.breaker import CircuitBreaker, CircuitOpenError
+from src.deadline import call_deadline
+from src.ratelimit import RateLimiter
+from src.request import (
+    ACCEPT_ENCODING,
+    endpoint_key,
+    get_headers,
+    is_retryable,
+    parse_retry_after,
+    perform_request,
+)
 
 
 class TestPerformRequest:
     base_url = "https://test.api.com"
     default_token = "test_token"
-    default_headers = {"Bearer": default_token, "accept": "application/json"}
+    default_headers = {
+        "Bearer": default_token,
+        "accept": "application/json",
+        "accept-encoding": ACCEPT_ENCODING,
+    }
     success_response = {"result": "success"}
     raise_for_status = None
 
@@ -119,3 +134,224 @@ class TestPerformRequest:
                 )
 
             assert mock_client.request.call_count == 5
+
+    @pytest.mark.asyncio
+    async def test_perform_request_uses_shared_client(self):
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = self.success_response
+        mock_response.raise_for_status.return_value = self.raise_for_status
+
+        shared_client = AsyncMock()
+        shared_client.request.return_value = mock_response
+
+        with patch("httpx.AsyncClient") as mock_client_class:
+            result = await perform_request(
+                f"{self.base_url}/endpoint",
+                "GET",
+                self.default_token,
+                client=shared_client,
+            )
+
+            mock_client_class.assert_not_called()
+            shared_client.request.assert_called_once_with(
+                "GET",
+                f"{self.base_url}/endpoint",
+                headers=self.default_headers,
+                json=None,
+            )
+            shared_client.aclose.assert_not_called()
+            assert result == self.success_response
+
+    @pytest.mark.asyncio
+    async def test_perform_request_keeps_shared_client_open(self):
+        results = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=self.success_response)
+
+        transport = httpx.MockTransport(handler)
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(3):
+                results.append(
+                    await perform_request(
+                        f"{self.base_url}/endpoint",
+                        "GET",
+                        self.default_token,
+                        client=client,
+                    )
+                )
+            assert not client.is_closed
+        assert results == [self.success_response] * 3
+
+    @pytest.mark.asyncio
+    async def test_perform_request_retries_429_with_retry_after(self):
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=self.success_response),
+        ]
+        limiter = RateLimiter(rate=1000, burst=1000)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return responses.pop(0)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with patch.object(limiter, "pause") as mock_pause:
+                result = await perform_request(
+                    f"{self.base_url}/endpoint",
+                    "GET",
+                    self.default_token,
+                    client=client,
+                    rate_limiter=limiter,
+                    endpoint="/endpoint",
+                )
+
+        assert result == self.success_response
+        assert not responses
+        assert mock_pause.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_perform_request_does_not_retry_client_errors(self):
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(400, headers={"Retry-After": "0"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await perform_request(
+                    f"{self.base_url}/endpoint",
+                    "GET",
+                    self.default_token,
+                    client=client,
+                )
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_perform_request_acquires_rate_limiter(self):
+        limiter = AsyncMock()
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json=self.success_response)
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            await perform_request(
+                f"{self.base_url}/endpoint",
+                "GET",
+                self.default_token,
+                client=client,
+                rate_limiter=limiter,
+                endpoint="/endpoint",
+            )
+        limiter.acquire.assert_awaited_once_with("/endpoint")
+
+    @pytest.mark.asyncio
+    async def test_perform_request_stops_retrying_past_deadline(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "30"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async with call_deadline(5.0):
+                with pytest.raises(RetryError):
+                    await perform_request(
+                        f"{self.base_url}/endpoint",
+                        "GET",
+                        self.default_token,
+                        client=client,
+                    )
+
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_perform_request_fails_fast_when_circuit_opens(self):
+        calls = []
+        breaker = CircuitBreaker(window=2, min_calls=2)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503, headers={"Retry-After": "0"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with pytest.raises(CircuitOpenError):
+                await perform_request(
+                    f"{self.base_url}/endpoint",
+                    "GET",
+                    self.default_token,
+                    client=client,
+                    endpoint="/endpoint",
+                    circuit_breaker=breaker,
+                )
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_perform_request_stream_returns_unread_response(self):
+        async def body():
+            yield json.dumps(self.success_response).encode()
+
+        responses = [
+            httpx.Response(503, headers={"Retry-After": "0"}, json={"detail": "busy"}),
+            httpx.Response(200, content=body()),
+        ]
+        transport = httpx.MockTransport(lambda request: responses.pop(0))
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await perform_request(
+                f"{self.base_url}/endpoint",
+                "GET",
+                self.default_token,
+                client=client,
+                stream=True,
+            )
+            assert not response.is_stream_consumed
+            assert json.loads(await response.aread()) == self.success_response
+            await response.aclose()
+        assert not responses
+
+    @pytest.mark.asyncio
+    async def test_perform_request_stream_needs_shared_client(self):
+        with pytest.raises(ValueError):
+            await perform_request(
+                f"{self.base_url}/endpoint", "GET", self.default_token, stream=True
+            )
+
+
+class TestRetryHelpers:
+    def test_get_headers_accepts_compression_and_extra_headers(self):
+        headers = get_headers("test_token", {"if-none-match": '"v1"'})
+        assert headers["accept-encoding"].startswith("gzip")
+        assert headers["if-none-match"] == '"v1"'
+        assert headers["Bearer"] == "test_token"
+
+    def test_parse_retry_after_seconds(self):
+        assert parse_retry_after("3") == 3.0
+
+    def test_parse_retry_after_http_date(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_parse_retry_after_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+    def test_is_retryable(self):
+        request = httpx.Request("GET", "https://test.api.com")
+        assert is_retryable(httpx.ConnectError("boom", request=request))
+        for status_code, expected in ((429, True), (503, True), (500, False)):
+            response = httpx.Response(status_code, request=request)
+            error = httpx.HTTPStatusError("", request=request, response=response)
+            assert is_retryable(error) is expected
+
+    def test_endpoint_key(self):
+        base_url = "https://test.api.com/api/v1"
+        assert endpoint_key(f"{base_url}/auth", base_url) == "/auth"
+        assert (
+            endpoint_key(
+                f"{base_url}/products/0b9a6c8e-3a3c-4f7f-9a7e-6d1f2b3c4d5e/offers",
+                base_url,
+            )
+            == "/products/{id}/offers"
+        )
@@ -0,0 +1,191 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.request import perform_request
+from src.scheduler import (
+    BULK,
+    INTERACTIVE,
+    Lane,
+    PriorityScheduler,
+    current_priority,
+    in_lane,
+    request_priority,
+)
+
+
+async def queue_up(scheduler, lane, order):
+    name = await scheduler.acquire(lane)
+    order.append(name)
+
+
+class TestPriorityScheduler:
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            PriorityScheduler(concurrency=0)
+        with pytest.raises(ValueError):
+            PriorityScheduler(lanes={"a": Lane()}, default_lane="b")
+        with pytest.raises(ValueError):
+            PriorityScheduler(lanes={INTERACTIVE: Lane(weight=0)})
+        with pytest.raises(ValueError):
+            PriorityScheduler(lanes={INTERACTIVE: Lane(max_concurrency=0)})
+        with pytest.raises(ValueError):
+            PriorityScheduler(bulk_lane="batch")
+
+    def test_bulk_lane(self):
+        assert PriorityScheduler().bulk_lane == BULK
+        assert (
+            PriorityScheduler(lanes={"a": Lane()}, default_lane="a").bulk_lane is None
+        )
+        assert (
+            PriorityScheduler(
+                lanes={"a": Lane(), "b": Lane()}, default_lane="a", bulk_lane="b"
+            ).bulk_lane
+            == "b"
+        )
+
+    @pytest.mark.asyncio
+    async def test_lane_from_request_priority(self):
+        scheduler = PriorityScheduler()
+        assert await scheduler.acquire() == INTERACTIVE
+        with request_priority(BULK):
+            assert current_priority() == BULK
+            assert await scheduler.acquire() == BULK
+            with request_priority(None):
+                assert await scheduler.acquire() == INTERACTIVE
+        assert current_priority() is None
+        with pytest.raises(ValueError):
+            await scheduler.acquire("batch")
+        assert scheduler.in_flight == 3
+        for lane in (INTERACTIVE, BULK, INTERACTIVE):
+            scheduler.release(lane)
+        assert scheduler.stats() == {
+            INTERACTIVE: {"in_flight": 0, "waiting": 0, "dispatched": 2},
+            BULK: {"in_flight": 0, "waiting": 0, "dispatched": 1},
+        }
+
+    @pytest.mark.asyncio
+    async def test_slots_shared_by_weight(self):
+        scheduler = PriorityScheduler(concurrency=1)
+        await scheduler.acquire(BULK)
+        order = []
+        tasks = [
+            asyncio.create_task(queue_up(scheduler, lane, order))
+            for lane in [BULK] * 5 + [INTERACTIVE] * 8
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()[BULK]["waiting"] == 5
+
+        lane = BULK
+        for _ in tasks:
+            scheduler.release(lane)
+            await asyncio.sleep(0)
+            lane = order[-1]
+        await asyncio.gather(*tasks)
+
+        # four interactive slots for every bulk one while both lanes wait
+        assert order[:10].count(INTERACTIVE) == 8
+        assert order[10:] == [BULK] * 3
+
+    @pytest.mark.asyncio
+    async def test_idle_lane_does_not_bank_credit(self):
+        scheduler = PriorityScheduler(
+            concurrency=1, lanes={"a": Lane(), "b": Lane()}, default_lane="a"
+        )
+        for _ in range(10):
+            scheduler.release(await scheduler.acquire("a"))
+        await scheduler.acquire("a")
+        order = []
+        tasks = [
+            asyncio.create_task(queue_up(scheduler, lane, order))
+            for lane in ["b"] * 4 + ["a"] * 4
+        ]
+        await asyncio.sleep(0)
+        lane = "a"
+        for _ in tasks:
+            scheduler.release(lane)
+            await asyncio.sleep(0)
+            lane = order[-1]
+        await asyncio.gather(*tasks)
+        assert order[:4].count("a") == 2
+
+    @pytest.mark.asyncio
+    async def test_lane_cap_leaves_room_for_other_lanes(self):
+        scheduler = PriorityScheduler(
+            concurrency=3,
+            lanes={INTERACTIVE: Lane(), BULK: Lane(max_concurrency=2)},
+        )
+        await scheduler.acquire(BULK)
+        await scheduler.acquire(BULK)
+        waiting = asyncio.create_task(scheduler.acquire(BULK))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        assert await scheduler.acquire(INTERACTIVE) == INTERACTIVE
+
+        scheduler.release(INTERACTIVE)
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        scheduler.release(BULK)
+        assert await waiting == BULK
+        assert scheduler.stats()[BULK]["in_flight"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        scheduler = PriorityScheduler(concurrency=1)
+        await scheduler.acquire()
+        cancelled = asyncio.create_task(scheduler.acquire())
+        waiting = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.stats()[INTERACTIVE]["waiting"] == 1
+
+        scheduler.release(INTERACTIVE)
+        assert await waiting == INTERACTIVE
+
+        # handed the slot and cancelled before it resumed
+        granted = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        scheduler.release(INTERACTIVE)
+        granted.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await granted
+        assert scheduler.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_in_lane(self):
+        async def lane_of(item):
+            return item, current_priority()
+
+        assert in_lane(lane_of, None) is lane_of
+        assert await in_lane(lane_of, BULK)(1) == (1, BULK)
+        assert current_priority() is None
+
+    @pytest.mark.asyncio
+    async def test_perform_request_holds_a_slot_per_attempt(self):
+        scheduler = PriorityScheduler(concurrency=1)
+        seen = []
+        responses = [
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"result": "success"}),
+        ]
+
+        def handler(request):
+            seen.append(scheduler.stats()[BULK]["in_flight"])
+            return responses.pop(0)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            with request_priority(BULK):
+                result = await perform_request(
+                    "https://test.api.com/endpoint",
+                    "GET",
+                    "test_token",
+                    client=client,
+                    scheduler=scheduler,
+                )
+
+        assert result == {"result": "success"}
+        assert seen == [1, 1]
+        assert scheduler.in_flight == 0
+        assert scheduler.stats()[BULK]["dispatched"] == 2
@@ -0,0 +1,119 @@
+import asyncio
+import sqlite3
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from src.models import Offer, TrustedOffer
+from src.snapshots import OfferSnapshotStore
+
+
+def make_offers(price: int):
+    return [Offer(id=uuid4(), price=price, items_in_stock=1)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OfferSnapshotStore(tmp_path / "snapshots.db", flush_interval=0.01)
+
+
+class TestOfferSnapshotStore:
+    @pytest.mark.asyncio
+    async def test_record_is_buffered_until_flush(self, store):
+        product_id = uuid4()
+        store.record(product_id, make_offers(100))
+        assert store.pending == 1
+        assert await store.latest(product_id) is None
+        await store.flush()
+        fetched_at, offers = await store.latest(product_id)
+        assert offers[0].price == 100
+        await store.aclose()
+
+    @pytest.mark.asyncio
+    async def test_background_flush(self, store):
+        product_id = uuid4()
+        store.record(product_id, make_offers(100))
+        await asyncio.sleep(0.1)
+        assert store.pending == 0
+        assert await store.latest(product_id) is not None
+        await store.aclose()
+
+    @pytest.mark.asyncio
+    async def test_batch_size_triggers_flush(self, tmp_path):
+        store = OfferSnapshotStore(
+            tmp_path / "snapshots.db", batch_size=2, flush_interval=60
+        )
+        store.record(uuid4(), make_offers(100))
+        store.record(uuid4(), make_offers(100))
+        await asyncio.sleep(0.05)
+        assert store.pending == 0
+        await store.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failed_write_keeps_batch_pending(self, tmp_path):
+        store = OfferSnapshotStore(tmp_path / "snapshots.db", flush_interval=60)
+        product_id = uuid4()
+        store.record(product_id, make_offers(100), fetched_at=10.0)
+        store.record(product_id, make_offers(90), fetched_at=20.0)
+        with patch.object(
+            store, "_write", side_effect=sqlite3.OperationalError("database is locked")
+        ):
+            with pytest.raises(sqlite3.OperationalError):
+                await store.flush()
+        assert store.pending == 2
+
+        store.record(product_id, make_offers(80), fetched_at=30.0)
+        await store.flush()
+        assert store.pending == 0
+        history = await store.history(product_id)
+        assert [offers[0].price for _, offers in history] == [100, 90, 80]
+        await store.aclose()
+
+    @pytest.mark.asyncio
+    async def test_latest_and_history(self, store):
+        product_id, other_id = uuid4(), uuid4()
+        store.record(product_id, make_offers(100), fetched_at=10.0)
+        store.record(product_id, make_offers(90), fetched_at=20.0)
+        store.record(product_id, make_offers(80), fetched_at=30.0)
+        store.record(other_id, make_offers(50), fetched_at=15.0)
+        await store.aclose()
+
+        fetched_at, offers = await store.latest(product_id)
+        assert (fetched_at, offers[0].price) == (30.0, 80)
+
+        history = await store.history(product_id, since=15.0, until=30.0)
+        assert [(at, offers[0].price) for at, offers in history] == [
+            (20.0, 90),
+            (30.0, 80),
+        ]
+        assert len(await store.history(product_id)) == 3
+
+        latest = await store.latest_all()
+        assert {key: value[0] for key, value in latest.items()} == {
+            product_id: 30.0,
+            other_id: 15.0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_latest_all_max_age(self, store):
+        fresh_id = uuid4()
+        store.record(uuid4(), make_offers(100), fetched_at=10.0)
+        store.record(fresh_id, make_offers(100))
+        await store.aclose()
+        assert list(await store.latest_all(max_age=60)) == [fresh_id]
+
+    @pytest.mark.asyncio
+    async def test_survives_reopen_and_trusted_offers(self, tmp_path):
+        product_id = uuid4()
+        offer_id = uuid4()
+        store = OfferSnapshotStore(tmp_path / "snapshots.db")
+        store.record(
+            product_id,
+            [TrustedOffer({"id": str(offer_id), "price": 10, "items_in_stock": 2})],
+        )
+        await store.aclose()
+
+        reopened = OfferSnapshotStore(tmp_path / "snapshots.db")
+        _, offers = await reopened.latest(product_id)
+        assert offers == [Offer(id=offer_id, price=10, items_in_stock=2)]
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from src.streaming import iter_json_array
+
+
+async def chunked(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def collect(body: bytes, size: int):
+    return [item async for item in iter_json_array(chunked(body, size))]
+
+
+class TestIterJsonArray:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("size", [1, 2, 7, 1024])
+    async def test_items_split_across_chunks(self, size):
+        items = [
+            {"id": "a", "price": 12345, "tags": ["x", "]", "\\"], "note": "ü,}"},
+            123.5,
+            "text",
+            None,
+            True,
+            [],
+            {},
+        ]
+        body = json.dumps(items, ensure_ascii=False, indent=1).encode()
+        assert await collect(body, size) == items
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("body", [b"[]", b" [ ] ", b"\n[\n]\n"])
+    async def test_empty_array(self, body):
+        assert await collect(body, 1) == []
+
+    @pytest.mark.asyncio
+    async def test_number_at_chunk_boundary(self):
+        assert await collect(b"[12,345]", 2) == [12, 345]
+
+    @pytest.mark.asyncio
+    async def test_yields_before_body_ends(self):
+        async def chunks():
+            yield b'[{"id": 1},'
+            raise AssertionError("read past the first item")
+
+        items = iter_json_array(chunks())
+        assert await anext(items) == {"id": 1}
+        await items.aclose()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "body",
+        [b"", b'{"id": 1}', b"[1 2]", b'[{"id": 1}', b"[1,", b'[{"id": ]'],
+    )
+    async def test_malformed(self, body):
+        with pytest.raises(json.JSONDecodeError):
+            await collect(body, 3)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time
+from uuid import uuid4
+
+import httpx
+import jwt
+import pytest
+
+from src.models import Offer, Product, ProductRegistered
+from src.sync_client import SyncProductClient
+
+
+class FakeApi:
+    def __init__(self):
+        self.auth_calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/auth"):
+            with self.lock:
+                self.auth_calls += 1
+            token = jwt.encode({"expires": int(time()) + 3600}, "secret" * 6)
+            return httpx.Response(201, json={"access_token": token})
+        if path.endswith("/products/register"):
+            return httpx.Response(201, json={"id": json.loads(request.content)["id"]})
+        if "/fail-" in path:
+            return httpx.Response(404)
+        return httpx.Response(
+            200, json=[{"id": str(uuid4()), "price": 100, "items_in_stock": 1}]
+        )
+
+
+@pytest.fixture
+def fake_api():
+    return FakeApi()
+
+
+@pytest.fixture
+def sync_client(fake_api):
+    client = SyncProductClient(
+        "test_refresh_token",
+        "https://test.api.com",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(fake_api)),
+        token_file=None,
+    )
+    yield client
+    client.close()
+
+
+def make_product() -> Product:
+    return Product(id=uuid4(), name="Test Product", description="sync")
+
+
+class TestSyncProductClient:
+    def test_register_product(self, sync_client):
+        product = make_product()
+        result = sync_client.register_product(product)
+        assert isinstance(result, ProductRegistered)
+        assert result.id == product.id
+
+    def test_get_product_offers(self, sync_client):
+        offers = sync_client.get_product_offers(uuid4())
+        assert len(offers) == 1
+        assert isinstance(offers[0], Offer)
+
+    def test_iter_product_offers(self, sync_client):
+        offers = list(sync_client.iter_product_offers(uuid4()))
+        assert len(offers) == 1
+        assert isinstance(offers[0], Offer)
+
+    def test_many_threads_share_one_token(self, sync_client, fake_api):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda _: sync_client.get_product_offers(uuid4()), range(40)
+                )
+            )
+        assert len(results) == 40
+        assert fake_api.auth_calls == 1
+
+    def test_register_products(self, sync_client):
+        products = [make_product() for _ in range(10)]
+        results = list(
+            sync_client.register_products(iter(products), concurrency=3, ordered=True)
+        )
+        assert [product for product, _ in results] == products
+        assert all(result.id == product.id for product, result in results)
+
+    def test_get_offers_for_many_isolates_errors(self, sync_client):
+        results = dict(sync_client.get_offers_for_many([uuid4(), "fail-1"]))
+        assert isinstance(results["fail-1"], httpx.HTTPStatusError)
+        assert len(results) == 2
+
+    def test_partial_iteration_closes_generator(self, sync_client):
+        for _ in sync_client.get_offers_for_many([uuid4() for _ in range(10)]):
+            break
+        assert sync_client.get_product_offers(uuid4())
+
+    def test_close(self, fake_api):
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(fake_api))
+        with SyncProductClient(
+            "test_refresh_token",
+            "https://test.api.com",
+            client=http_client,
+            token_file=None,
+        ) as client:
+            thread = client._thread
+        assert not thread.is_alive()
+        with pytest.raises(RuntimeError):
+            client.get_product_offers(uuid4())
+        client.close()
+
+    def test_timeout_cancels_the_call(self):
+        started = threading.Event()
+        finished = []
+
+        async def slow_api(request):
+            if request.url.path.endswith("/auth"):
+                token = jwt.encode({"expires": int(time()) + 3600}, "secret" * 6)
+                return httpx.Response(201, json={"access_token": token})
+            started.set()
+            await asyncio.sleep(0.3)
+            finished.append(request)
+            return httpx.Response(200, json=[])
+
+        with SyncProductClient(
+            "test_refresh_token",
+            "https://test.api.com",
+            call_timeout=0.1,
+            client=httpx.AsyncClient(transport=httpx.MockTransport(slow_api)),
+            token_file=None,
+        ) as client:
+            with pytest.raises(TimeoutError):
+                client.get_product_offers(uuid4())
+            assert started.is_set()
+            # the request was cancelled, not left running after the timeout
+            sleep(0.4)
+            assert not finished
+            with pytest.raises(TimeoutError):
+                for _ in client.get_offers_for_many([uuid4(), uuid4()]):
+                    pass
+        assert not finished
+
+    def test_http_timeout_reaches_product_client(self):
+        timeout = httpx.Timeout(5.0)
+        with SyncProductClient(
+            "test_refresh_token",
+            "https://test.api.com",
+            timeout=timeout,
+            token_file=None,
+        ) as client:
+            assert client.call_timeout is None
+            assert client.client.http_client.timeout == timeout
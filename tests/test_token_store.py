@@ -0,0 +1,125 @@
+import asyncio
+import multiprocessing
+from pathlib import Path
+from time import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from src.auth import TokenManager
+from src.token_store import FileTokenStore, SQLiteTokenStore
+
+
+def make_store(kind: str, path: Path):
+    if kind == "file":
+        return FileTokenStore(path / "token.json")
+    return SQLiteTokenStore(path / "token.db")
+
+
+def refresh_in_worker(kind: str, path: str, ready, results) -> None:
+    store = make_store(kind, Path(path))
+    auth_log = Path(path) / "auth_calls.log"
+
+    async def fake_auth(*args, **kwargs):
+        with auth_log.open("a") as log:
+            log.write("auth\n")
+        await asyncio.sleep(0.3)
+        token = jwt.encode({"expires": int(time()) + 3600}, "secret" * 6)
+        return {"access_token": token}
+
+    async def run() -> str:
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_store=store
+        )
+        with patch("src.auth.perform_request", side_effect=fake_auth):
+            ready.wait()
+            return await token_manager.get_access_token()
+
+    results.put(asyncio.run(run()))
+
+
+@pytest.mark.parametrize("kind", ["file", "sqlite"])
+class TestTokenStore:
+    def test_load_empty(self, kind, tmp_path):
+        assert make_store(kind, tmp_path).load() is None
+
+    def test_save_and_load(self, kind, tmp_path):
+        make_store(kind, tmp_path).save("test_token")
+        assert make_store(kind, tmp_path).load() == "test_token"
+
+    def test_lock_is_exclusive(self, kind, tmp_path):
+        first = make_store(kind, tmp_path)
+        second = make_store(kind, tmp_path)
+        assert first.try_lock()
+        assert not second.try_lock()
+        first.unlock()
+        assert second.try_lock()
+        second.unlock()
+
+    def test_one_refresh_across_processes(self, kind, tmp_path):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(
+                target=refresh_in_worker, args=(kind, str(tmp_path), ready, results)
+            )
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        ready.set()
+        tokens = [results.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert len(set(tokens)) == 1
+        assert (tmp_path / "auth_calls.log").read_text() == "auth\n"
+
+
+class TestSQLiteTokenStore:
+    def test_expired_lock_is_taken_over(self, tmp_path):
+        first = SQLiteTokenStore(tmp_path / "token.db", lock_ttl=-1)
+        second = SQLiteTokenStore(tmp_path / "token.db")
+        assert first.try_lock()
+        assert second.try_lock()
+
+    def test_keys_are_separate(self, tmp_path):
+        SQLiteTokenStore(tmp_path / "token.db", key="a").save("token_a")
+        SQLiteTokenStore(tmp_path / "token.db", key="b").save("token_b")
+        assert SQLiteTokenStore(tmp_path / "token.db", key="a").load() == "token_a"
+
+
+class TestTokenManagerWithStore:
+    @pytest.mark.asyncio
+    async def test_authenticate_uses_token_refreshed_elsewhere(self, tmp_path):
+        store = FileTokenStore(tmp_path / "token.json")
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_store=store
+        )
+        token_manager.access_token = "rejected_token"
+        fresh_token = jwt.encode({"expires": int(time()) + 3600}, "secret" * 6)
+        store.save(fresh_token)
+
+        with patch("src.auth.perform_request") as mock_perform_request:
+            assert await token_manager.authenticate() == fresh_token
+            mock_perform_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_authenticate_refreshes_rejected_stored_token(self, tmp_path):
+        store = FileTokenStore(tmp_path / "token.json")
+        token_manager = TokenManager(
+            "test_refresh_token", "https://test.api.com", token_store=store
+        )
+        rejected_token = jwt.encode({"expires": int(time()) + 3600}, "secret" * 6)
+        store.save(rejected_token)
+        token_manager.access_token = rejected_token
+
+        with patch("src.auth.perform_request") as mock_perform_request:
+            mock_perform_request.return_value = {"access_token": "new_token"}
+            assert await token_manager.authenticate() == "new_token"
+
+        assert store.load() == "new_token"
+        assert store.try_lock()
+        store.unlock()
@@ -0,0 +1,148 @@
+import asyncio
+from collections import Counter
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from src.models import Offer
+from src.watch import (
+    ADDED,
+    PRICE_CHANGED,
+    REMOVED,
+    STOCK_CHANGED,
+    diff_offers,
+    watch_offers,
+)
+
+
+class TestDiffOffers:
+    def test_diff(self):
+        product_id = uuid4()
+        kept, changed, removed, added = (uuid4() for _ in range(4))
+        old = {
+            kept: Offer(id=kept, price=100, items_in_stock=1),
+            changed: Offer(id=changed, price=100, items_in_stock=1),
+            removed: Offer(id=removed, price=100, items_in_stock=1),
+        }
+        new = {
+            kept: Offer(id=kept, price=100, items_in_stock=1),
+            changed: Offer(id=changed, price=90, items_in_stock=0),
+            added: Offer(id=added, price=80, items_in_stock=3),
+        }
+
+        changes = diff_offers(product_id, old, new)
+
+        assert [(change.kind, change.offer_id) for change in changes] == [
+            (PRICE_CHANGED, changed),
+            (STOCK_CHANGED, changed),
+            (ADDED, added),
+            (REMOVED, removed),
+        ]
+        assert changes[0].old.price == 100 and changes[0].new.price == 90
+        assert all(change.product_id == product_id for change in changes)
+
+
+class TestWatchOffers:
+    @pytest.mark.asyncio
+    async def test_emits_only_changes(self):
+        product_id = uuid4()
+        offer_id = uuid4()
+        prices = iter([100, 100, 90])
+
+        async def fetch(requested_id):
+            assert requested_id == product_id
+            return [Offer(id=offer_id, price=next(prices), items_in_stock=1)]
+
+        changes = watch_offers(
+            fetch, [product_id], interval=0.01, min_interval=0.01, max_interval=0.01
+        )
+        change = await asyncio.wait_for(anext(changes), timeout=1)
+        await changes.aclose()
+
+        assert change.kind == PRICE_CHANGED
+        assert change.new.price == 90
+
+    @pytest.mark.asyncio
+    async def test_emit_initial(self):
+        offer = Offer(id=uuid4(), price=100, items_in_stock=1)
+
+        async def fetch(product_id):
+            return [offer]
+
+        changes = watch_offers(fetch, [uuid4()], interval=5, emit_initial=True)
+        change = await asyncio.wait_for(anext(changes), timeout=1)
+        await changes.aclose()
+        assert change.kind == ADDED
+
+    @pytest.mark.asyncio
+    async def test_volatile_products_polled_more_often(self):
+        volatile, stable = uuid4(), uuid4()
+        polls = Counter()
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fetch(product_id):
+            nonlocal in_flight, max_in_flight
+            polls[product_id] += 1
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            price = polls[product_id] if product_id == volatile else 100
+            return [Offer(id=product_id, price=price, items_in_stock=1)]
+
+        async def consume():
+            async for _ in watch_offers(
+                fetch,
+                [volatile, stable],
+                interval=0.02,
+                min_interval=0.005,
+                max_interval=0.2,
+                concurrency=1,
+            ):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert polls[volatile] > 3 * polls[stable]
+        assert max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_poll_keeps_watching(self):
+        offer_id = uuid4()
+        results = [
+            [Offer(id=offer_id, price=100, items_in_stock=1)],
+            Exception("Upstream failed"),
+            [Offer(id=offer_id, price=100, items_in_stock=0)],
+        ]
+
+        async def fetch(product_id):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        with patch("src.watch.logger") as mock_logger:
+            changes = watch_offers(
+                fetch, [uuid4()], interval=0.01, min_interval=0.01, max_interval=0.01
+            )
+            change = await asyncio.wait_for(anext(changes), timeout=1)
+            await changes.aclose()
+
+        assert change.kind == STOCK_CHANGED
+        mock_logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self):
+        async def fetch(product_id):
+            return []
+
+        with pytest.raises(ValueError):
+            await anext(watch_offers(fetch, [uuid4()], concurrency=0))
+        with pytest.raises(ValueError):
+            await anext(watch_offers(fetch, [uuid4()], interval=1, min_interval=2))